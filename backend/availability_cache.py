@@ -0,0 +1,146 @@
+"""Process-wide cache of doctor availability (/date and /time).
+
+/resource/{doc_id}/date and /time answers are kept for a short TTL, so
+the prefetcher, find_earliest_slots and the get_date/get_time tools
+reuse each other's requests instead of asking the CRM again. Entries are
+keyed by doctor, services and date (or date range). A successful
+create/delete of a visit invalidates the doctor's entries right away, so
+a booking never relies on a slot that was already taken.
+
+The cache lives in the job process. With LiveKit's default executor each
+call runs in its own process, so the cache is per call and is not shared
+between concurrent calls.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from crm_client import DEFAULT_SERVICE_IDS, crm
+
+logger = logging.getLogger("availability_cache")
+
+AVAILABILITY_DATES_TTL_S = float(os.getenv("AVAILABILITY_DATES_TTL_S", "60"))
+AVAILABILITY_TIMES_TTL_S = float(os.getenv("AVAILABILITY_TIMES_TTL_S", "20"))
+AVAILABILITY_MAX_ENTRIES = int(os.getenv("AVAILABILITY_MAX_ENTRIES", "2000"))
+
+
+class AvailabilityCache:
+    def __init__(
+        self,
+        dates_ttl_s: float = AVAILABILITY_DATES_TTL_S,
+        times_ttl_s: float = AVAILABILITY_TIMES_TTL_S,
+        max_entries: int = AVAILABILITY_MAX_ENTRIES,
+    ):
+        self.dates_ttl_s = dates_ttl_s
+        self.times_ttl_s = times_ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (stored_at, data); key[1] всегда doc_id
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        # Поколение врача растёт при каждой инвалидации: ответ, запрошенный
+        # до записи/отмены, уже не попадёт в кэш
+        self._generation: dict[int, int] = {}
+        self._global_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+        self._age_total = 0.0
+        self._age_max = 0.0
+
+    def _get(self, key: tuple, ttl: float) -> tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age <= ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._age_total += age
+                    self._age_max = max(self._age_max, age)
+                    return True, entry[1]
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return False, None
+
+    def _generation_of(self, doc_id: int) -> tuple[int, int]:
+        with self._lock:
+            return self._global_generation, self._generation.get(doc_id, 0)
+
+    def _put(self, key: tuple, data: Any, generation: tuple[int, int]) -> None:
+        with self._lock:
+            if generation != (self._global_generation, self._generation.get(key[1], 0)):
+                return
+            self._entries[key] = (time.monotonic(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_dates(
+        self, doc_id: int, from_date: str, to_date: str, service_ids: Iterable[int] = DEFAULT_SERVICE_IDS
+    ) -> Any:
+        key = ("dates", doc_id, tuple(service_ids), from_date, to_date)
+        found, data = self._get(key, self.dates_ttl_s)
+        if found:
+            return data
+        generation = self._generation_of(doc_id)
+        data = await crm.get_dates(doc_id, from_date, to_date, key[2])
+        self._put(key, data, generation)
+        return data
+
+    async def get_times(self, doc_id: int, date: str, service_ids: Iterable[int] = DEFAULT_SERVICE_IDS) -> Any:
+        key = ("times", doc_id, tuple(service_ids), date)
+        found, data = self._get(key, self.times_ttl_s)
+        if found:
+            return data
+        generation = self._generation_of(doc_id)
+        data = await crm.get_times(doc_id, date, key[2])
+        self._put(key, data, generation)
+        return data
+
+    def invalidate(self, doc_id: Optional[int] = None) -> None:
+        """Drop a doctor's entries, or everything when the doctor is unknown."""
+        with self._lock:
+            self.invalidations += 1
+            if doc_id is None:
+                self._global_generation += 1
+                self._entries.clear()
+                return
+            self._generation[doc_id] = self._generation.get(doc_id, 0) + 1
+            for key in [k for k in self._entries if k[1] == doc_id]:
+                del self._entries[key]
+        logger.info(f"Availability cache invalidated for doc_id={doc_id}")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                # Возраст отданных из кэша ответов — насколько они могли устареть
+                "served_age_avg_s": round(self._age_total / self.hits, 2) if self.hits else 0.0,
+                "served_age_max_s": round(self._age_max, 2),
+            }
+
+
+def visit_doc_id(visit: dict) -> Optional[int]:
+    """Doctor (resource) id of a CRM visit, if the payload carries one."""
+    for holder in (visit, visit.get("appointment") or {}):
+        if holder.get("resourceId") is not None:
+            return int(holder["resourceId"])
+        resource = holder.get("resource")
+        if isinstance(resource, dict) and resource.get("id") is not None:
+            return int(resource["id"])
+    return None
+
+
+availability = AvailabilityCache()
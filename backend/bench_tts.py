@@ -0,0 +1,187 @@
+"""Offline benchmark of LocalSileroTTS.
+
+    python bench_tts.py                         # full matrix, JSON to stdout
+    python bench_tts.py --out bench.json        # JSON to a file
+    python bench_tts.py --concurrency 1 4 --rates 16000 --table
+    python bench_tts.py --no-all-flags          # only put_accent=True, put_yo=True
+
+Runs a fixed corpus of typical clinic replies with 1, 4, 8 and 16
+concurrent synthesis streams across output sample rates and the
+put_accent/put_yo settings. As in a live call, the first phrase of each
+reply is submitted at PRIORITY_FIRST and the rest at PRIORITY_NEXT. For
+every combination it reports real-time factor, p50/p95/p99
+time-to-first-audio, CPU-seconds per minute of speech, CPU utilization
+and peak RSS. Needs only the local model artifact.
+
+Each combination runs in a fresh subprocess, so peak RSS (ru_maxrss is a
+high-water mark) and the scheduler metrics belong to that run alone.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from tts_scheduler import PRIORITY_FIRST, PRIORITY_NEXT, available_cpus
+from tts_silero import LocalSileroTTS, _PhraseSplitter, check_model_artifact, model_registry
+
+CORPUS = [
+    "Клиника «Алиф Дэнт». Здравствуйте, как я могу вам помочь?",
+    "Подскажите, пожалуйста, что вас беспокоит?",
+    "Ближайшее свободное время у терапевта — завтра в десять утра.",
+    "Подтверждаю запись: лечение кариеса, 15 января, 14:00. Всё верно?",
+    "Для осмотра и консультации подойдёт терапевт. Могу записать вас к Сагындыковой Азизе Рысбековне, "
+    "у неё есть свободные окна на этой неделе.",
+    "Стоимость профессиональной гигиены полости рта — 4500 рублей.",
+    "Всё верно?",
+    "Спасибо за звонок. До свидания!",
+]
+
+CONCURRENCY = [1, 4, 8, 16]
+SAMPLE_RATES = [48000, 24000, 16000, 8000]
+ACCENT_YO = [(True, True), (True, False), (False, True), (False, False)]
+
+
+def _percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux; a high-water mark for the whole process
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _stream(tts: LocalSileroTTS, rounds: int, ttfa: list[float]) -> tuple[float, float]:
+    """One simulated call: speaks every corpus reply phrase by phrase."""
+    audio_s = 0.0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for reply in CORPUS:
+            splitter = _PhraseSplitter()
+            phrases = splitter.push(reply) + splitter.flush()
+            reply_start = time.perf_counter()
+            for i, phrase in enumerate(phrases):
+                # Как в LocalSileroTTSStream: первая фраза ответа идёт вне очереди
+                pcm = await tts._synthesize_pcm(phrase, PRIORITY_FIRST if i == 0 else PRIORITY_NEXT)
+                if i == 0:
+                    ttfa.append(time.perf_counter() - reply_start)
+                audio_s += len(pcm) / 2 / tts.sample_rate
+    return time.perf_counter() - started, audio_s
+
+
+async def bench(sample_rate: int, put_accent: bool, put_yo: bool, concurrency: int, rounds: int) -> dict:
+    tts = LocalSileroTTS(
+        sample_rate=sample_rate, put_accent=put_accent, put_yo=put_yo, use_cache=False
+    )
+    await tts._synthesize_pcm(CORPUS[0])  # warm-up
+
+    ttfa: list[float] = []
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    results = await asyncio.gather(*[_stream(tts, rounds, ttfa) for _ in range(concurrency)])
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    await tts.aclose()
+
+    audio_s = sum(a for _, a in results)
+    return {
+        "sample_rate": sample_rate,
+        "model_rate": tts.model_sample_rate,
+        "put_accent": put_accent,
+        "put_yo": put_yo,
+        "concurrency": concurrency,
+        "utterances": len(ttfa),
+        "audio_s": round(audio_s, 2),
+        "wall_s": round(wall, 2),
+        # per stream: synthesis time / audio time, < 1 means faster than real time
+        "rtf": round(statistics.mean(w / a for w, a in results), 4),
+        "ttfa_p50_ms": round(_percentile(ttfa, 50) * 1000, 1),
+        "ttfa_p95_ms": round(_percentile(ttfa, 95) * 1000, 1),
+        "ttfa_p99_ms": round(_percentile(ttfa, 99) * 1000, 1),
+        "cpu_s_per_min": round(cpu / audio_s * 60, 2),
+        "cpu_utilization": round(cpu / (wall * available_cpus()), 3),
+        "rss_mb": round(_rss_mb(), 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "scheduler": tts.scheduler.metrics(),
+    }
+
+
+def run_one(sample_rate: int, put_accent: bool, put_yo: bool, concurrency: int, rounds: int) -> dict:
+    """One combination in this process (called inside the per-run subprocess)."""
+    check_model_artifact("v5_ru")
+    model_registry.preload("ru", "v5_ru", "cpu")
+    return asyncio.run(bench(sample_rate, put_accent, put_yo, concurrency, rounds))
+
+
+def _run_isolated(sample_rate: int, put_accent: bool, put_yo: bool, concurrency: int, rounds: int) -> dict:
+    config = [sample_rate, put_accent, put_yo, concurrency, rounds]
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--single", json.dumps(config)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def main(args) -> dict:
+    check_model_artifact("v5_ru")
+
+    runs = []
+    for sample_rate, (put_accent, put_yo), concurrency in itertools.product(
+        args.rates, ACCENT_YO if args.all_flags else ACCENT_YO[:1], args.concurrency
+    ):
+        result = _run_isolated(sample_rate, put_accent, put_yo, concurrency, args.rounds)
+        runs.append(result)
+        if args.table:
+            print(
+                f"{sample_rate:>6} Hz accent={put_accent!s:<5} yo={put_yo!s:<5} x{concurrency:<3}"
+                f" RTF {result['rtf']:<7} TTFA p50/p95/p99 {result['ttfa_p50_ms']}/"
+                f"{result['ttfa_p95_ms']}/{result['ttfa_p99_ms']} ms"
+                f" CPU {result['cpu_utilization']:.0%} peak RSS {result['peak_rss_mb']} MB",
+                file=sys.stderr,
+            )
+    return {
+        "host": {"cpus": available_cpus(), "python": platform.python_version(), "machine": platform.machine()},
+        "env": {k: v for k, v in os.environ.items() if k.startswith("SILERO_")},
+        "corpus_size": len(CORPUS),
+        "rounds": args.rounds,
+        "runs": runs,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY)
+    parser.add_argument("--rates", type=int, nargs="+", default=SAMPLE_RATES)
+    parser.add_argument("--all-flags", action=argparse.BooleanOptionalAction, default=True,
+                        help="run every put_accent/put_yo combination; --no-all-flags runs only "
+                             "put_accent=True, put_yo=True")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--table", action="store_true", help="also print a human-readable line per run to stderr")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_one(*json.loads(args.single))))
+        sys.exit(0)
+
+    report = main(args)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,180 @@
+"""Caller profile loaded in the background as soon as the call connects.
+
+Upcoming visits and the doctor of the most recent past visit are fetched
+while the greeting plays. "Хочу отменить запись" or "к тому же врачу,
+что и в прошлый раз" can then be answered from UserData without a
+blocking CRM call.
+"""
+import asyncio
+import datetime
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from availability_cache import visit_doc_id
+from crm_client import crm, phone_key, visits_by_phone
+from doctors import DOCTORS_BY_ID
+from prefetch import CLINIC_TZ
+from tool_results import say_day
+from tts_normalize import say_time
+
+logger = logging.getLogger("caller_profile")
+
+CALLER_HISTORY_DAYS = int(os.getenv("CALLER_HISTORY_DAYS", "90"))
+CALLER_UPCOMING_DAYS = int(os.getenv("CALLER_UPCOMING_DAYS", "60"))
+# Сколько инструмент ждёт ещё не загруженный профиль, прежде чем ответить без него
+CALLER_PROFILE_WAIT_S = float(os.getenv("CALLER_PROFILE_WAIT_S", "3"))
+
+_DATETIME_KEYS = ("datetime", "dateTime", "start", "startAt", "date")
+_CANCELLED_STATUSES = {"canceled", "cancelled", "deleted", "отменен", "отменён", "отменена", "удалена"}
+
+
+@dataclass
+class CallerProfile:
+    phone: str
+    upcoming: list[dict] = field(default_factory=list)
+    last_doc_id: Optional[int] = None
+    last_visit_date: Optional[str] = None
+    # Сброшен после создания/отмены записи в этом звонке (или если список записей
+    # обрезан по числу страниц) — тогда снова спрашиваем CRM
+    fresh: bool = True
+    truncated: bool = False
+
+    def visits_on(self, date: str) -> list[dict]:
+        return [v for v in self.upcoming if v["date"] == date]
+
+    def summary(self) -> dict[str, Any]:
+        doctor = DOCTORS_BY_ID.get(self.last_doc_id)
+        return {
+            "upcoming": [{k: v for k, v in visit.items() if k != "raw"} for visit in self.upcoming],
+            "last_doctor": (
+                {"doc_id": doctor.doc_id, "name": doctor.name, "specialty": doctor.specialty}
+                if doctor else None
+            ),
+            "last_visit_date": self.last_visit_date,
+            **({"incomplete": True} if self.truncated else {}),
+        }
+
+
+def visit_datetime(visit: dict) -> Optional[datetime.datetime]:
+    """Start of the visit in clinic time (naive values are taken as clinic time)."""
+    for holder in (visit, visit.get("appointment") or {}):
+        for key in _DATETIME_KEYS:
+            value = holder.get(key)
+            if not isinstance(value, str):
+                continue
+            try:
+                when = datetime.datetime.fromisoformat(value.replace("Z", "+00:00").replace(" ", "T", 1))
+            except ValueError:
+                continue
+            # "2026-01-15T21:30:00Z" — это 16 января 00:30 по Москве, а не 15-е
+            return when.astimezone(CLINIC_TZ) if when.tzinfo is not None else when
+    return None
+
+
+def _is_active(visit: dict) -> bool:
+    """Not deleted and not in a cancelled status."""
+    status = visit.get("status")
+    if isinstance(status, dict):
+        status = status.get("code") or status.get("name")
+    return not visit.get("deleted", True) and str(status or "").lower() not in _CANCELLED_STATUSES
+
+
+def _compact(visit: dict, when: datetime.datetime) -> dict:
+    doc_id = visit_doc_id(visit)
+    doctor = DOCTORS_BY_ID.get(doc_id)
+    return {
+        "id": visit.get("id"),
+        "date": when.date().isoformat(),
+        "say": f"{say_day(when.date())}, в {say_time(when.hour, when.minute)}",
+        "doc_id": doc_id,
+        "doctor": doctor.name if doctor else None,
+        "raw": visit,
+    }
+
+
+async def load_caller_profile(phone: str) -> CallerProfile:
+    today = datetime.datetime.now(CLINIC_TZ).date()
+    past_from = (today - datetime.timedelta(days=CALLER_HISTORY_DAYS)).isoformat()
+    yesterday = (today - datetime.timedelta(days=1)).isoformat()
+    ahead = (today + datetime.timedelta(days=CALLER_UPCOMING_DAYS)).isoformat()
+
+    # Прошлые и будущие записи запрашиваем параллельно
+    past, future = await asyncio.gather(
+        crm.list_visits(past_from, yesterday, phone=phone),
+        crm.list_visits(today.isoformat(), ahead, phone=phone),
+    )
+    key = phone_key(phone)
+    profile = CallerProfile(phone=phone)
+    profile.truncated = past.truncated or future.truncated
+    # Без полного списка будущих записей отмену всё равно проверяем по CRM
+    profile.fresh = not future.truncated
+
+    upcoming = []
+    for visit in visits_by_phone(future).get(key, []):
+        when = visit_datetime(visit)
+        if when is not None and _is_active(visit):
+            upcoming.append((when, visit))
+    profile.upcoming = [_compact(v, when) for when, v in sorted(upcoming, key=lambda x: x[0].isoformat())]
+
+    history = []
+    for visit in visits_by_phone(past).get(key, []):
+        when = visit_datetime(visit)
+        # Отменённый визит — не «тот же врач, что в прошлый раз»
+        if when is not None and visit_doc_id(visit) is not None and _is_active(visit):
+            history.append((when, visit))
+    if history:
+        when, visit = max(history, key=lambda x: x[0].isoformat())
+        profile.last_doc_id = visit_doc_id(visit)
+        profile.last_visit_date = when.date().isoformat()
+
+    logger.info(
+        f"Caller profile: {len(profile.upcoming)} upcoming visits, last doc_id={profile.last_doc_id}"
+        + (" (visit list truncated)" if profile.truncated else "")
+    )
+    return profile
+
+
+def start_caller_profile(userdata, phone: str) -> asyncio.Task:
+    """Load the profile in the background into userdata.caller_profile."""
+
+    async def _load() -> Optional[CallerProfile]:
+        try:
+            profile = await load_caller_profile(phone)
+        except Exception as e:
+            logger.warning(f"Caller profile lookup failed: {e}")
+            return None
+        userdata.caller_profile = profile
+        # «К тому же врачу» — его расписание тоже подтянем заранее
+        if profile.last_doc_id is not None:
+            userdata.prefetcher.prefetch_doctor(profile.last_doc_id)
+        return profile
+
+    userdata.caller_profile_task = asyncio.create_task(_load())
+    return userdata.caller_profile_task
+
+
+async def get_caller_profile(userdata, timeout_s: float = CALLER_PROFILE_WAIT_S) -> Optional[CallerProfile]:
+    """Loaded profile, waiting up to ``timeout_s`` for the background lookup.
+
+    None if there is no profile yet; the lookup keeps running and may still
+    fill userdata.caller_profile later in the call.
+    """
+    if userdata.caller_profile is not None:
+        return userdata.caller_profile
+    task = userdata.caller_profile_task
+    if task is None:
+        return None
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout_s)
+    except asyncio.TimeoutError:
+        logger.warning(f"Caller profile not loaded within {timeout_s:.0f} s")
+        return None
+
+
+async def stop_caller_profile(userdata) -> None:
+    task = userdata.caller_profile_task
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,645 @@
+"""Async client for the 1denta CRM exchange API.
+
+One place for the base URL, auth header, timeouts, retries and error
+parsing used by the agent tools. All requests go through the shared
+keep-alive session from http_pool, and identical concurrent GETs are
+coalesced into one upstream request.
+
+    from crm_client import crm, CrmError
+
+    try:
+        dates = await crm.get_dates(doc_id, "2026-01-15", "2026-01-20")
+    except CrmError as e:
+        return e.to_json()
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+import aiohttp
+import phonenumbers
+from phonenumbers import PhoneNumberFormat
+
+from http_pool import get_session
+
+logger = logging.getLogger("crm_client")
+
+CRM_BASE_URL = os.getenv("CRM_BASE_URL", "https://crmexchange.1denta.ru/api/v2")
+# Токен только из окружения (.env), в коде секретов не держим
+CRM_TOKEN = os.getenv("CRM_TOKEN", "")
+
+# Услуга, под которую CRM отдаёт расписание врачей
+DEFAULT_SERVICE_IDS = (515,)
+
+# Таймауты (сек) по типу запроса: агент не должен молчать дольше, чем ждёт пациент
+ENDPOINT_TIMEOUTS = {
+    "auth": 5.0,
+    "services": 10.0,
+    "resources": 5.0,
+    "dates": 5.0,
+    "times": 5.0,
+    "visits": 8.0,
+    "visit": 5.0,
+    "create_visit": 10.0,
+    "delete_visit": 8.0,
+}
+DEFAULT_TIMEOUT_S = float(os.getenv("CRM_TIMEOUT_S", "8"))
+
+# Если заданы логин и пароль, токен получаем через /auth и обновляем сами;
+# иначе работаем со статическим CRM_TOKEN
+CRM_EMAIL = os.getenv("CRM_EMAIL", "")
+CRM_PASSWORD = os.getenv("CRM_PASSWORD", "")
+CRM_TOKEN_TTL_S = float(os.getenv("CRM_TOKEN_TTL_S", "43200"))
+CRM_TOKEN_REFRESH_MARGIN_S = float(os.getenv("CRM_TOKEN_REFRESH_MARGIN_S", "300"))
+# Пауза перед новой попыткой /auth после неудачной
+CRM_AUTH_RETRY_S = float(os.getenv("CRM_AUTH_RETRY_S", "60"))
+# Сколько запрос ждёт обновления токена, прежде чем пойти со статическим CRM_TOKEN
+CRM_AUTH_WAIT_S = float(os.getenv("CRM_AUTH_WAIT_S", "6"))
+
+CRM_RETRIES = int(os.getenv("CRM_RETRIES", "2"))
+CRM_RETRY_BASE_S = float(os.getenv("CRM_RETRY_BASE_S", "0.2"))
+CRM_BREAKER_FAILURES = int(os.getenv("CRM_BREAKER_FAILURES", "5"))
+CRM_BREAKER_RESET_S = float(os.getenv("CRM_BREAKER_RESET_S", "30"))
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Имя query-параметра для фильтра записей по телефону на стороне CRM (если она его поддерживает)
+CRM_VISIT_PHONE_PARAM = os.getenv("CRM_VISIT_PHONE_PARAM", "")
+CRM_VISITS_MAX_PAGES = int(os.getenv("CRM_VISITS_MAX_PAGES", "20"))
+# Сколько страниц /visit грузим одновременно
+CRM_VISITS_CONCURRENCY = int(os.getenv("CRM_VISITS_CONCURRENCY", "4"))
+
+
+class CrmError(Exception):
+    """CRM request failed: HTTP error, timeout, network error or open breaker."""
+
+    def __init__(self, message: str, http_status: Optional[int] = None, code: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.http_status = http_status
+        self.code = code
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"http_status": self.http_status, "code": self.code, "message": self.message},
+            ensure_ascii=False,
+        )
+
+
+class VisitList(list):
+    """list_visits() result; ``truncated`` is set when CRM_VISITS_MAX_PAGES cut it short."""
+
+    truncated = False
+
+
+class CircuitOpenError(CrmError):
+    def __init__(self, retry_in: float):
+        super().__init__(
+            f"CRM временно недоступна, повторите через {retry_in:.0f} с",
+            code="CRM_UNAVAILABLE",
+        )
+
+
+class CircuitBreaker:
+    """Fails fast after ``failures`` consecutive CRM failures.
+
+    Stays open for ``reset_s`` seconds, then lets a single probe request
+    through (half-open); its outcome closes or re-opens the breaker.
+    Only transport errors, timeouts and 5xx count as failures; any other
+    response means the CRM is up.
+    """
+
+    def __init__(self, failures: int = 5, reset_s: float = 30.0):
+        self.failures = failures
+        self.reset_s = reset_s
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_s:
+            return "half-open"
+        return "open"
+
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError if open; True if this request is the half-open probe."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return False
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_s - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(retry_in)
+
+    def end_probe(self) -> None:
+        """Let another request probe if this one ended without a verdict (cancelled, bug)."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("CRM circuit closed")
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or (self._opened_at is None and self._consecutive >= self.failures):
+                self._opened_at = time.monotonic()
+                self.trips += 1
+                logger.warning(f"CRM circuit opened after {self._consecutive} failures")
+            self._probing = False
+
+
+class _SingleFlight:
+    """At most one running coroutine per key and event loop.
+
+    Waiters share the task through asyncio.shield, so one that is
+    cancelled or gives up after ``timeout_s`` leaves the request running
+    for the others. A task belongs to the loop that created it, so flights
+    are kept per loop; those of loops that have since closed are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[tuple[asyncio.AbstractEventLoop, Any], asyncio.Task] = {}
+        self.joined = 0
+
+    def start(self, key: Any, factory: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start ``factory()`` unless a request for ``key`` is already running on this loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for stale in [k for k in self._flights if k[0].is_closed()]:
+                del self._flights[stale]
+            task = self._flights.get((loop, key))
+            if task is not None and not task.done():
+                self.joined += 1
+                return task
+            task = self._flights[(loop, key)] = loop.create_task(factory())
+        task.add_done_callback(lambda t: self._finish((loop, key), t))
+        return task
+
+    async def run(
+        self, key: Any, factory: Callable[[], Awaitable[Any]], timeout_s: Optional[float] = None
+    ) -> Any:
+        return await asyncio.wait_for(asyncio.shield(self.start(key, factory)), timeout_s)
+
+    def _finish(self, flight: tuple, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._flights.get(flight) is task:
+                del self._flights[flight]
+        # Все ожидающие могли уйти по таймауту — забираем ошибку, чтобы asyncio не ругался
+        if not task.cancelled():
+            task.exception()
+
+
+class TokenManager:
+    """CRM bearer token shared by every request of the job process.
+
+    The token is obtained once via /auth and cached until shortly before
+    expiry (JWT ``exp``, or CRM_TOKEN_TTL_S after issue when the token has
+    no ``exp``). Inside the refresh margin the current token is still
+    returned while one background refresh runs. Concurrent refreshes,
+    including several 401s at once, share a single auth request; a
+    request waits for it at most CRM_AUTH_WAIT_S and otherwise goes on
+    with the static token. After a failed /auth the next attempt waits
+    CRM_AUTH_RETRY_S. Without CRM_EMAIL/CRM_PASSWORD the static token is
+    used as is; it is also the fallback when /auth fails.
+    """
+
+    def __init__(self, client: "CrmClient", email: str = CRM_EMAIL, password: str = CRM_PASSWORD,
+                 static_token: str = CRM_TOKEN):
+        self._client = client
+        self.email = email
+        self.password = password
+        self.static_token = static_token
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        # Раньше этого времени /auth не повторяем (после ошибки)
+        self._retry_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.refresh_errors = 0
+        if not self.static_token and not self.can_refresh:
+            logger.warning("Neither CRM_TOKEN nor CRM_EMAIL/CRM_PASSWORD is set, CRM requests will be rejected")
+
+    @property
+    def can_refresh(self) -> bool:
+        return bool(self.email and self.password)
+
+    async def get(self) -> str:
+        if not self.can_refresh:
+            return self.static_token
+        now = time.time()
+        if self._token is None or now >= self._expires_at:
+            if self._token is not None and now < self._retry_at:
+                # /auth только что не удался — не дёргаем его на каждый запрос
+                return self._token
+            return await self._refresh_once()
+        if now >= self._expires_at - CRM_TOKEN_REFRESH_MARGIN_S and now >= self._retry_at:
+            self._start_refresh()
+        return self._token
+
+    async def refresh_after_401(self, rejected: str) -> Optional[str]:
+        """New token after ``rejected`` got 401, or None if we can't refresh."""
+        if not self.can_refresh:
+            return None
+        if self._token is not None and self._token != rejected:
+            # Кто-то уже обновил токен, пока шёл наш запрос
+            return self._token
+        if time.time() < self._retry_at:
+            return None
+        self._expires_at = 0.0
+        fresh = await self._refresh_once()
+        return fresh if fresh != rejected else None
+
+    def _start_refresh(self) -> asyncio.Task:
+        task = self._current_refresh()
+        if task is None:
+            task = self._refreshing = asyncio.create_task(self._refresh())
+            # Ошибку разбирает _refresh; забираем её, даже если никто не дождался
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    def _current_refresh(self) -> Optional[asyncio.Task]:
+        task = self._refreshing
+        # Задача от другого event loop (например, прогрева каталога) нам не годится
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    async def _refresh_once(self) -> str:
+        # Отмена или таймаут одного ожидающего не обрывает общий запрос к /auth
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._start_refresh()), CRM_AUTH_WAIT_S)
+        except asyncio.TimeoutError:
+            pass
+        if self._token is not None and time.time() < self._expires_at:
+            return self._token
+        if self.static_token:
+            logger.warning(f"CRM auth took longer than {CRM_AUTH_WAIT_S:.0f} s, using the static token")
+            return self.static_token
+        raise CrmError(f"CRM не выдала токен за {CRM_AUTH_WAIT_S:.0f} с", code="CRM_TIMEOUT")
+
+    async def _refresh(self) -> str:
+        try:
+            token = await self._client.auth(self.email, self.password)
+        except CrmError:
+            self.refresh_errors += 1
+            self._retry_at = time.time() + CRM_AUTH_RETRY_S
+            # Старый токен ещё может работать — не роняем разговор, пока он не истёк
+            if self._token is not None and time.time() < self._expires_at:
+                logger.warning("CRM token refresh failed, keeping the current token")
+                return self._token
+            if self.static_token:
+                # Запасной статический токен; /auth попробуем снова через CRM_AUTH_RETRY_S
+                logger.warning("CRM auth failed, falling back to the static token")
+                self._token, self._expires_at = self.static_token, self._retry_at
+                return self._token
+            raise
+        self._token = token
+        self._expires_at = _token_expiry(token)
+        self._retry_at = 0.0
+        self.refreshes += 1
+        logger.info(f"CRM token refreshed, valid for {self._expires_at - time.time():.0f} s")
+        return token
+
+
+class CrmClient:
+    def __init__(
+        self,
+        base_url: str = CRM_BASE_URL,
+        token: str = CRM_TOKEN,
+        retries: int = CRM_RETRIES,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.breaker = breaker or CircuitBreaker(CRM_BREAKER_FAILURES, CRM_BREAKER_RESET_S)
+        self.tokens = TokenManager(self, static_token=token)
+        # Одинаковые GET, идущие одновременно, делят один запрос к CRM
+        self._inflight = _SingleFlight()
+
+    def _headers(self, token: Optional[str], json_body: bool = False) -> dict[str, str]:
+        headers = {"Accept": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if json_body:
+            headers["Content-Type"] = "application/json"
+        return headers
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        params: Any = None,
+        payload: Optional[dict] = None,
+        auth: bool = True,
+        retries: Optional[int] = None,
+    ) -> Any:
+        if method != "GET":
+            return await self._authorized(method, path, endpoint, params, payload, auth, retries)
+
+        # Отмена одного ожидающего не обрывает запрос, который ждут другие.
+        # Ответ общий для всех ожидающих — его нельзя менять на месте
+        wait_s = self._max_duration_s(endpoint, retries)
+        try:
+            return await self._inflight.run(
+                (path, _params_key(params), auth),
+                lambda: self._authorized(method, path, endpoint, params, payload, auth, retries),
+                wait_s,
+            )
+        except asyncio.TimeoutError:
+            raise CrmError(f"CRM не ответила за {wait_s:.0f} с", code="CRM_TIMEOUT") from None
+
+    def _max_duration_s(self, endpoint: str, retries: Optional[int] = None) -> float:
+        """Upper bound of one GET: token wait, then every attempt with backoff, twice on a 401."""
+        attempts = 1 + (self.retries if retries is None else retries)
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT_S)
+        backoff = CRM_RETRY_BASE_S * (2 ** (attempts - 1) - 1)
+        return 2 * (CRM_AUTH_WAIT_S + attempts * timeout + backoff)
+
+    async def _authorized(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        params: Any,
+        payload: Optional[dict],
+        auth: bool,
+        retries: Optional[int] = None,
+    ) -> Any:
+        if not auth:
+            return await self._send(method, path, endpoint, params, payload, None, retries)
+        token = await self.tokens.get()
+        try:
+            return await self._send(method, path, endpoint, params, payload, token, retries)
+        except CrmError as e:
+            if e.http_status != 401:
+                raise
+            # Токен истёк посреди разговора: один раз обновляем и повторяем запрос
+            fresh = await self.tokens.refresh_after_401(token)
+            if fresh is None:
+                raise
+            return await self._send(method, path, endpoint, params, payload, fresh, retries)
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        params: Any,
+        payload: Optional[dict],
+        token: Optional[str],
+        retries: Optional[int] = None,
+    ) -> Any:
+        # Повторяем только идемпотентные GET: POST/DELETE могут дойти до CRM и без ответа
+        attempts = 1 + ((self.retries if retries is None else retries) if method == "GET" else 0)
+        timeout = aiohttp.ClientTimeout(total=ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT_S))
+        url = f"{self.base_url}{path}"
+        headers = self._headers(token, json_body=payload is not None)
+        data = json.dumps(payload, ensure_ascii=False) if payload is not None else None
+
+        for attempt in range(attempts):
+            probe = self.breaker.before_request()
+            started = time.perf_counter()
+            try:
+                session = get_session()
+                async with session.request(
+                    method, url, headers=headers, params=params, data=data, timeout=timeout
+                ) as response:
+                    status = response.status
+                    raw = await response.text()
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                error = CrmError(f"CRM не ответила за {timeout.total:.0f} с", code="CRM_TIMEOUT")
+            except aiohttp.ClientError as e:
+                self.breaker.record_failure()
+                error = CrmError(f"Ошибка соединения с CRM: {e}", code="CRM_NETWORK_ERROR")
+            except BaseException:
+                # Пробный запрос отменён или упал не на CRM: иначе breaker навсегда остался бы half-open
+                if probe:
+                    self.breaker.end_probe()
+                raise
+            else:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                logger.info(f"CRM {method} {path} -> {status} in {elapsed_ms:.0f} ms")
+                if 200 <= status < 300:
+                    self.breaker.record_success()
+                    return json.loads(raw) if raw else None
+                error = _parse_error(status, raw)
+                # 4xx — CRM жива, просто запрос неверный
+                if status < 500:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                if status not in _RETRY_STATUSES:
+                    raise error
+
+            if attempt + 1 < attempts:
+                # Full jitter: разносим повторы разных звонков во времени
+                delay = random.uniform(0, CRM_RETRY_BASE_S * 2 ** attempt)
+                logger.warning(f"CRM {method} {path} failed ({error.message}), retry in {delay:.2f} s")
+                await asyncio.sleep(delay)
+        raise error
+
+    async def auth(self, email: str, password: str) -> str:
+        data = await self._request(
+            "POST", "/auth", "auth", payload={"email": email, "password": password}, auth=False
+        )
+        return data["token"]
+
+    async def get_services(self, page: int = 2, per_page: int = 460, retries: Optional[int] = None) -> Any:
+        return await self._request(
+            "GET", "/service", "services", params={"page": page, "perPage": per_page}, retries=retries
+        )
+
+    async def get_resources(self) -> Any:
+        return await self._request("GET", "/resource", "resources")
+
+    async def get_dates(
+        self, doc_id: int, from_date: str, to_date: str, service_ids: Iterable[int] = DEFAULT_SERVICE_IDS
+    ) -> Any:
+        params = [("serviceIds[]", str(s)) for s in service_ids] + [("from", from_date), ("to", to_date)]
+        return await self._request("GET", f"/resource/{doc_id}/date", "dates", params=params)
+
+    async def get_times(self, doc_id: int, date: str, service_ids: Iterable[int] = DEFAULT_SERVICE_IDS) -> Any:
+        params = [("serviceIds[]", str(s)) for s in service_ids] + [("date", date)]
+        return await self._request("GET", f"/resource/{doc_id}/time", "times", params=params)
+
+    async def get_visit(self, visit_id: int) -> Any:
+        return await self._request("GET", f"/visit/{visit_id}", "visit")
+
+    async def _visits_page(self, params: dict, page: int) -> Any:
+        return await self._request("GET", "/visit", "visits", params={**params, "page": str(page)})
+
+    async def list_visits(
+        self, date_from: str, date_till: str, per_page: int = 100, phone: Optional[str] = None
+    ) -> VisitList:
+        """Every visit in the period, following pagination.
+
+        If CRM_VISIT_PHONE_PARAM is set, ``phone`` is sent as that query
+        parameter so the CRM filters server-side. Callers should still
+        check the phone themselves. At most CRM_VISITS_MAX_PAGES pages are
+        read; if there were more, the result has ``truncated`` set.
+        """
+        params = {"dateFrom": date_from, "dateTill": date_till, "perPage": str(per_page)}
+        if phone and CRM_VISIT_PHONE_PARAM:
+            params[CRM_VISIT_PHONE_PARAM] = phone
+
+        first = await self._visits_page(params, 1)
+        visits = VisitList(_items(first))
+        last_page = _last_page(first)
+        if last_page is not None:
+            # Число страниц известно — остальные грузим параллельно, но не все разом
+            semaphore = asyncio.Semaphore(CRM_VISITS_CONCURRENCY)
+
+            async def _page(page: int) -> Any:
+                async with semaphore:
+                    return await self._visits_page(params, page)
+
+            pages = range(2, min(last_page, CRM_VISITS_MAX_PAGES) + 1)
+            for data in await asyncio.gather(*(_page(p) for p in pages)):
+                visits.extend(_items(data))
+            visits.truncated = last_page > CRM_VISITS_MAX_PAGES
+        else:
+            page, items = 1, visits
+            while len(items) >= per_page and page < CRM_VISITS_MAX_PAGES:
+                page += 1
+                items = _items(await self._visits_page(params, page))
+                visits.extend(items)
+            visits.truncated = len(items) >= per_page
+        if visits.truncated:
+            logger.warning(
+                f"Visits {date_from}..{date_till} cut at {CRM_VISITS_MAX_PAGES} pages ({len(visits)} visits)"
+            )
+        return visits
+
+    async def create_visit(
+        self,
+        name: str,
+        phone: str,
+        resource_id: Optional[int],
+        date_and_time: str,
+        service_ids: Iterable[int] = DEFAULT_SERVICE_IDS,
+        comment: str = "",
+    ) -> Any:
+        payload = {
+            "visit": {
+                "user": {"name": name, "phone": phone},
+                "comment": comment,
+                "appointment": {
+                    "serviceIds": list(service_ids),
+                    "resourceId": resource_id,
+                    "datetime": date_and_time,
+                },
+            }
+        }
+        return await self._request("POST", "/visit", "create_visit", payload=payload)
+
+    async def delete_visit(self, visit_id: int) -> Any:
+        return await self._request("DELETE", f"/visit/{visit_id}", "delete_visit")
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "coalesced_requests": self._inflight.joined,
+            "token_refreshes": self.tokens.refreshes,
+            "token_refresh_errors": self.tokens.refresh_errors,
+            "breaker_state": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+            "breaker_rejected": self.breaker.rejected,
+        }
+
+
+def _params_key(params: Any) -> tuple:
+    if params is None:
+        return ()
+    items = params.items() if isinstance(params, dict) else params
+    return tuple(sorted((str(k), str(v)) for k, v in items))
+
+
+def _token_expiry(token: str) -> float:
+    """Unix time the freshly issued JWT expires at: ``exp`` claim, else now + CRM_TOKEN_TTL_S."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        claims = {}
+    if isinstance(claims.get("exp"), (int, float)):
+        return float(claims["exp"])
+    return time.time() + CRM_TOKEN_TTL_S
+
+
+def _items(data: Any) -> list[dict]:
+    return data if isinstance(data, list) else (data or {}).get("data", [])
+
+
+def _last_page(data: Any) -> Optional[int]:
+    """Total page count from the pagination meta, if the CRM sent it."""
+    if not isinstance(data, dict):
+        return None
+    for holder in (data.get("meta") or {}, data.get("pagination") or {}, data):
+        for key in ("lastPage", "last_page", "totalPages", "pageCount"):
+            if isinstance(holder.get(key), int):
+                return holder[key]
+    return None
+
+
+def phone_key(phone: Optional[str]) -> str:
+    """Comparable form of a phone: last 10 digits ("+7(999)851-66-92" -> "9998516692")."""
+    return "".join(c for c in phone or "" if c.isdigit())[-10:]
+
+
+def format_ru(phone: str) -> str:
+    """Phone in the CRM's format: "89998516692" -> "+7(999)851-66-92"."""
+    num = phonenumbers.parse(phone, "RU")
+    intl = phonenumbers.format_number(num, PhoneNumberFormat.INTERNATIONAL)
+    intl = intl.replace(" ", "")
+    intl = intl.replace("+7", "+7(")
+    return intl[:6] + ")" + intl[6:]
+
+
+def visits_by_phone(visits: list[dict]) -> dict[str, list[dict]]:
+    index: dict[str, list[dict]] = {}
+    for visit in visits:
+        key = phone_key((visit.get("clientData") or {}).get("phone"))
+        if key:
+            index.setdefault(key, []).append(visit)
+    return index
+
+
+def _parse_error(status: int, raw: str) -> CrmError:
+    try:
+        error = json.loads(raw)
+    except json.JSONDecodeError:
+        error = None
+    if not isinstance(error, dict):
+        error = {"code": "UNKNOWN_ERROR", "message": raw}
+    return CrmError(error.get("message") or f"HTTP {status}", http_status=status, code=error.get("code"))
+
+
+# Один клиент (и один circuit breaker) на процесс воркера
+crm = CrmClient()
@@ -0,0 +1,77 @@
+"""Clinic doctors roster used by the agent prompt and the availability prefetcher."""
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Doctor:
+    doc_id: int
+    specialty: str
+    name: str
+
+
+DOCTORS = [
+    Doctor(1, "Главный врач", "Умарбеков Канатбек Умарбекович"),
+    Doctor(2, "Ортодонт", "Туратбекова Каныкей Туратбековна"),
+    Doctor(6, "Гигиенист", "Садыков Арген Акылбекович"),
+    Doctor(15, "Терапевт", "Эрк уулу Нияз"),
+    Doctor(17, "Ортодонт", "Михалина Альфия, Галимьяновна"),
+    Doctor(20, "Терапевт", "Сагындыкова Азиза Рысбековна"),
+    Doctor(31, "Терапевт", "Ажыбаев Темирлан Акылбекович"),
+    Doctor(36, "Врач общей практики", "Асылбеков Азат Асылбекович"),
+    Doctor(37, "Хирург", "Лебедев Данила Сергеевич"),
+    Doctor(38, "Гигиенист", "Орлов Евгений Алексеевич"),
+]
+
+DOCTORS_BY_ID = {d.doc_id: d for d in DOCTORS}
+
+_WORD = re.compile(r"\w+")
+
+
+def doctors_prompt() -> str:
+    return "\n".join(f"    {d.specialty} — {d.name}, doc_id: {d.doc_id}" for d in DOCTORS)
+
+
+def doctors_by_specialty(text: str) -> list[Doctor]:
+    """Doctors whose specialty is named in text ("терапевта", "к гигиенисту")."""
+    words = {_stem(w) for w in _WORD.findall(text or "") if len(w) > 3}
+    scores = {}
+    for d in DOCTORS:
+        # "врач" есть в двух специальностях и сам по себе ничего не различает
+        parts = [_stem(p) for p in _WORD.findall(d.specialty) if len(p) > 3 and p.lower() != "врач"]
+        score = sum(1 for p in parts if any(w.startswith(p) or p.startswith(w) for w in words))
+        if score:
+            scores[d] = score
+    best = max(scores.values(), default=0)
+    return [d for d, score in scores.items() if score == best]
+
+
+def _stem(word: str) -> str:
+    # "Лебедеву", "Лебедева" -> "лебед": хватает, чтобы узнать фамилию в падеже
+    return word.lower().replace("ё", "е")[:max(4, len(word) - 2)]
+
+
+def _is_patronymic(word: str) -> bool:
+    return word.lower() in ("уулу", "кызы") or word.endswith(("вич", "вна", "ична"))
+
+
+# Фамилия и имя врача (без отчества) -> doc_id
+_NAME_STEMS = {
+    _stem(part): d.doc_id
+    for d in DOCTORS
+    for part in re.findall(r"\w+", d.name)
+    if len(part) > 3 and not _is_patronymic(part)
+}
+
+
+def mentioned_doctors(text: str) -> list[int]:
+    """doc_ids of doctors named in a message, in order of appearance."""
+    found = []
+    for word in _WORD.findall(text or ""):
+        if len(word) <= 3:
+            continue
+        w = word.lower().replace("ё", "е")
+        for stem, doc_id in _NAME_STEMS.items():
+            if w.startswith(stem) and doc_id not in found:
+                found.append(doc_id)
+    return found
@@ -0,0 +1,55 @@
+"""Download a Silero TTS model artifact for baking into the agent image.
+
+    python download_silero_model.py v5_ru
+
+Writes models/<model_id>.pt (or $SILERO_MODEL_DIR) and a .sha256 file next
+to it, so the agent never needs torch.hub or GitHub at runtime.
+
+The expected digest comes from --sha256 or $SILERO_MODEL_SHA256 and is
+required: an unpinned download is refused (after printing its digest)
+unless --allow-unpinned is given for local experiments.
+"""
+import argparse
+import hashlib
+import os
+import urllib.request
+from pathlib import Path
+
+MODEL_DIR = Path(os.getenv("SILERO_MODEL_DIR", Path(__file__).parent / "models"))
+MODEL_URL = "https://models.silero.ai/models/tts/{language}/{model_id}.pt"
+
+
+def download(model_id: str, language: str = "ru", sha256: str | None = None, allow_unpinned: bool = False) -> Path:
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    path = MODEL_DIR / f"{model_id}.pt"
+    url = MODEL_URL.format(language=language, model_id=model_id)
+
+    print(f"Downloading {url} -> {path}")
+    tmp = path.with_suffix(".part")
+    urllib.request.urlretrieve(url, tmp)
+
+    digest = hashlib.sha256(tmp.read_bytes()).hexdigest()
+    if not sha256 and not allow_unpinned:
+        tmp.unlink()
+        raise SystemExit(
+            f"No checksum pinned for {model_id}; downloaded sha256 is {digest}. "
+            f"Verify it and set SILERO_MODEL_SHA256 (or pass --allow-unpinned)."
+        )
+    if sha256 and digest != sha256:
+        tmp.unlink()
+        raise SystemExit(f"Checksum mismatch for {model_id}: {digest} != {sha256}")
+
+    os.replace(tmp, path)
+    path.with_suffix(".sha256").write_text(f"{digest}  {path.name}\n")
+    print(f"Saved {path} ({path.stat().st_size} bytes, sha256 {digest})")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("model_id", nargs="?", default="v5_ru")
+    parser.add_argument("--language", default="ru")
+    parser.add_argument("--sha256", default=os.getenv("SILERO_MODEL_SHA256"))
+    parser.add_argument("--allow-unpinned", action="store_true", help="accept any digest (dev only)")
+    args = parser.parse_args()
+    download(args.model_id, args.language, args.sha256, args.allow_unpinned)
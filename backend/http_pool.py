@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import os
+import threading
+
+import aiohttp
+
+logger = logging.getLogger("http_pool")
+
+# Один пул соединений на event loop воркера: keep-alive и TLS к CRM переиспользуются
+# между вызовами инструментов вместо нового рукопожатия на каждый запрос.
+HTTP_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+HTTP_KEEPALIVE_S = float(os.getenv("HTTP_POOL_KEEPALIVE_S", "60"))
+HTTP_DNS_TTL_S = int(os.getenv("HTTP_POOL_DNS_TTL_S", "300"))
+
+# Сессия aiohttp привязана к своему event loop, поэтому пул — по одной на loop
+_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+_lock = threading.Lock()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Shared keep-alive ClientSession for the current event loop.
+
+    Created lazily on first use and recreated if it was closed. Sessions
+    left behind by loops that have since been closed are detached so
+    they don't pile up. Do not close it per request; call close_session()
+    on shutdown instead.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        _prune_closed_loops()
+        session = _sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_LIMIT,
+                limit_per_host=HTTP_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_S,
+                ttl_dns_cache=HTTP_DNS_TTL_S,
+                use_dns_cache=True,
+                enable_cleanup_closed=True,
+            )
+            session = _sessions[loop] = aiohttp.ClientSession(connector=connector)
+            logger.info("HTTP pool session created")
+        return session
+
+
+def _prune_closed_loops() -> None:
+    for loop in [lp for lp in _sessions if lp.is_closed()]:
+        session = _sessions.pop(loop)
+        if not session.closed:
+            # Закрыть её уже нельзя (loop мёртв) — отцепляем коннектор и отпускаем ссылку
+            session.detach()
+            logger.warning("HTTP pool session of a closed event loop detached; call close_session() on shutdown")
+
+
+async def close_session() -> None:
+    """Close the current loop's session."""
+    with _lock:
+        session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+        logger.info("HTTP pool session closed")
@@ -0,0 +1,156 @@
+"""Speculative availability prefetch for one call.
+
+As soon as a doctor comes up in the conversation, their free dates for
+the next ``PREFETCH_DAYS`` days start loading in the background, followed
+by the time slots of the nearest ``PREFETCH_TIME_DAYS`` available days.
+get_date/get_time then await the already running request instead of
+starting a new round-trip to the CRM. Requests go through the shared
+availability cache, and a prefetched answer older than that cache's TTL
+is not used.
+"""
+import asyncio
+import datetime
+import logging
+import os
+import re
+import time
+from typing import Any, Optional
+
+import pytz
+
+from availability_cache import availability
+from crm_client import crm
+from doctors import DOCTORS_BY_ID, mentioned_doctors
+from tool_results import shape_dates
+
+logger = logging.getLogger("prefetch")
+
+PREFETCH_DAYS = int(os.getenv("PREFETCH_DAYS", "14"))
+PREFETCH_TIME_DAYS = int(os.getenv("PREFETCH_TIME_DAYS", "2"))
+PREFETCH_MAX_DOCTORS = int(os.getenv("PREFETCH_MAX_DOCTORS", "3"))
+CLINIC_TZ = pytz.timezone("Europe/Moscow")
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class AvailabilityPrefetcher:
+    def __init__(self, days: int = PREFETCH_DAYS, time_days: int = PREFETCH_TIME_DAYS):
+        self.days = days
+        self.time_days = time_days
+        # doc_id -> (from, to, task с ответом /date, время запуска)
+        self._dates: dict[int, tuple[str, str, asyncio.Task, float]] = {}
+        # (doc_id, date) -> (task с ответом /time, время запуска)
+        self._times: dict[tuple[int, str], tuple[asyncio.Task, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def _window(self) -> tuple[str, str]:
+        today = datetime.datetime.now(CLINIC_TZ).date()
+        return today.isoformat(), (today + datetime.timedelta(days=self.days - 1)).isoformat()
+
+    def _start(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        # Ошибка префетча не страшна: инструмент просто сходит в CRM сам
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self.prefetched += 1
+        return task
+
+    def on_message(self, text: str) -> None:
+        """Prefetch doctors mentioned in a conversation message."""
+        for doc_id in mentioned_doctors(text)[:PREFETCH_MAX_DOCTORS]:
+            self.prefetch_doctor(doc_id)
+
+    def prefetch_doctor(self, doc_id: int) -> None:
+        if doc_id not in DOCTORS_BY_ID or doc_id in self._dates:
+            return
+        from_date, to_date = self._window()
+        logger.info(f"Prefetching availability for doc_id={doc_id}")
+        self._dates[doc_id] = (
+            from_date, to_date, self._start(self._load_dates(doc_id, from_date, to_date)), time.monotonic()
+        )
+
+    async def _load_dates(self, doc_id: int, from_date: str, to_date: str) -> Any:
+        data = await availability.get_dates(doc_id, from_date, to_date)
+        self._prefetch_nearest_times(doc_id, data, from_date, to_date)
+        return data
+
+    def _prefetch_nearest_times(self, doc_id: int, data: Any, from_date: str, to_date: str) -> None:
+        nearest = shape_dates(data, limit=self.time_days, from_date=from_date, to_date=to_date)["dates"]
+        for d in nearest:
+            key = (doc_id, d["date"])
+            if key not in self._times:
+                self._times[key] = (self._start(availability.get_times(doc_id, d["date"])), time.monotonic())
+
+    async def _await(self, task: Optional[asyncio.Task], started: float, ttl: float) -> tuple[bool, Any]:
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            return False, None
+        # Старше TTL общего кэша — слот мог уйти, спрашиваем кэш/CRM заново
+        if time.monotonic() - started > ttl:
+            return False, None
+        try:
+            # shield: прерванный вызов инструмента не должен отменять общий префетч
+            return True, await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                return False, None
+            raise
+        except Exception:
+            return False, None
+
+    async def get_dates(self, doc_id: int, from_date: str, to_date: str, prefetch_times: bool = True) -> Any:
+        """Raw /date payload, possibly for a wider window than requested.
+
+        ``prefetch_times=False`` skips the background /time requests, for
+        callers that fetch times themselves under their own concurrency limit.
+        """
+        entry = self._dates.get(doc_id)
+        if entry and _ISO_DATE.match(from_date) and _ISO_DATE.match(to_date) \
+                and entry[0] <= from_date and to_date <= entry[1]:
+            ok, data = await self._await(entry[2], entry[3], availability.dates_ttl_s)
+            if ok:
+                self.hits += 1
+                if prefetch_times:
+                    self._prefetch_nearest_times(doc_id, data, from_date, to_date)
+                return data
+            self._dates.pop(doc_id, None)
+
+        self.misses += 1
+        data = await availability.get_dates(doc_id, from_date, to_date)
+        if prefetch_times:
+            self._prefetch_nearest_times(doc_id, data, from_date, to_date)
+        return data
+
+    async def get_times(self, doc_id: int, date: str) -> Any:
+        task, started = self._times.get((doc_id, date), (None, 0.0))
+        ok, data = await self._await(task, started, availability.times_ttl_s)
+        if ok:
+            self.hits += 1
+            return data
+        self._times.pop((doc_id, date), None)
+        self.misses += 1
+        return await availability.get_times(doc_id, date)
+
+    def invalidate(self, doc_id: Optional[int] = None) -> None:
+        """Forget prefetched availability after a booking changed it."""
+        if doc_id is None:
+            dates, times = list(self._dates), list(self._times)
+        else:
+            dates = [doc_id] if doc_id in self._dates else []
+            times = [k for k in self._times if k[0] == doc_id]
+        for d in dates:
+            self._dates.pop(d)[2].cancel()
+        for k in times:
+            self._times.pop(k)[0].cancel()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "prefetched": self.prefetched}
+
+    async def aclose(self) -> None:
+        tasks = [entry[2] for entry in self._dates.values()] + [t for t, _ in self._times.values()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(
+            f"Prefetch stats: {self.stats()}, availability cache: {availability.stats()}, CRM: {crm.metrics()}"
+        )
@@ -0,0 +1,145 @@
+"""Pre-rendered audio for the fixed phrases the agent always says.
+
+Build step (run once per image, see Dockerfile.agent):
+
+    python prompt_bank.py --speaker baya --sample-rate 16000
+
+renders every phrase in PROMPTS to raw 16-bit mono PCM under
+prompts/<speaker>_<sample_rate>/. At runtime PromptBank memory-maps those
+files and plays them back as audio frames without running the model.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import AsyncIterator
+
+from livekit import rtc
+
+logger = logging.getLogger("prompt_bank")
+
+PROMPTS_DIR = Path(os.getenv("PROMPTS_DIR", Path(__file__).parent / "prompts"))
+
+# Фиксированные фразы агента: ключ -> текст
+PROMPTS = {
+    "greeting": "Клиника «Алиф Дэнт». Здравствуйте, как я могу вам помочь?",
+    "goodbye": "Спасибо за звонок. До свидания!",
+    "transfer": "Перевожу на менеджера.",
+    "transfer_failed": "Извините, скорее всего все менеджеры заняты. Чем ещё могу помочь?",
+}
+
+
+# Параметры синтеза банка; совпадают с LocalSileroTTS в agent.py/agentos.py
+RENDER_PARAMS = {
+    "model_id": "v5_ru",
+    "put_accent": True,
+    "put_yo": True,
+    "put_stress_homo": False,
+    "put_yo_homo": True,
+    "normalize_text": True,
+}
+
+
+def _digest(text: str, speaker: str, sample_rate: int, params: dict) -> str:
+    """Manifest key: changes with the text or with anything that changes the audio."""
+    key = json.dumps(
+        {"text": text, "speaker": speaker, "sample_rate": sample_rate, **params}, ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class PromptBank:
+    """Memory-mapped bank of pre-rendered prompts for one speaker and rate."""
+
+    def __init__(self, speaker: str, sample_rate: int, root: Path = PROMPTS_DIR, params: dict = RENDER_PARAMS):
+        self.speaker = speaker
+        self.sample_rate = sample_rate
+        self.params = params
+        self.dir = Path(root) / f"{speaker}_{sample_rate}"
+        self._maps: dict[str, mmap.mmap] = {}
+        self._load()
+
+    def _load(self):
+        manifest_path = self.dir / "manifest.json"
+        if not manifest_path.exists():
+            logger.warning(f"Prompt bank {self.dir} not found, prompts will be synthesized live")
+            return
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        for key, text in PROMPTS.items():
+            # Пропускаем фразы, текст или параметры синтеза которых поменялись после сборки
+            if manifest.get(key) != _digest(text, self.speaker, self.sample_rate, self.params):
+                logger.warning(f"Prompt '{key}' is missing or stale in {self.dir}")
+                continue
+            path = self.dir / f"{key}.pcm"
+            try:
+                size = path.stat().st_size
+            except OSError:
+                size = 0
+            # Пустой или обрезанный файл mmap не откроет — такую фразу синтезируем вживую
+            if size == 0 or size % 2:
+                logger.warning(f"Prompt '{key}' audio is empty or truncated in {self.dir}, re-render the bank")
+                continue
+            with open(path, "rb") as f:
+                self._maps[key] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        logger.info(f"Prompt bank loaded: {sorted(self._maps)} from {self.dir}")
+
+    def has(self, key: str) -> bool:
+        return key in self._maps
+
+    async def frames(self, key: str, frame_ms: int = 20) -> AsyncIterator[rtc.AudioFrame]:
+        data = memoryview(self._maps[key])
+        samples = self.sample_rate * frame_ms // 1000
+        frame_bytes = samples * 2
+        for i in range(0, len(data) - len(data) % 2, frame_bytes):
+            chunk = data[i:i + frame_bytes]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=1,
+                samples_per_channel=len(chunk) // 2,
+            )
+
+    def say(self, session, key: str, **kwargs):
+        """session.say() for a fixed phrase, using pre-rendered audio if present."""
+        if self.has(key):
+            kwargs["audio"] = self.frames(key)
+        return session.say(PROMPTS[key], **kwargs)
+
+
+def render_prompts(
+    speaker: str, sample_rate: int, root: Path = PROMPTS_DIR, params: dict = RENDER_PARAMS
+) -> Path:
+    from tts_normalize import normalize_ru
+    from tts_silero import LocalSileroTTS
+
+    tts = LocalSileroTTS(speaker=speaker, sample_rate=sample_rate, use_cache=False, **params)
+    out_dir = Path(root) / f"{speaker}_{sample_rate}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {}
+    for key, text in PROMPTS.items():
+        pcm = tts._generate_pcm(normalize_ru(text) if params.get("normalize_text") else text)
+        (out_dir / f"{key}.pcm").write_bytes(pcm)
+        manifest[key] = _digest(text, speaker, sample_rate, params)
+        print(f"{key}: {len(pcm) / 2 / sample_rate:.2f}s")
+
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return out_dir
+
+
+if __name__ == "__main__":
+    from tts_silero import TELEPHONY_SAMPLE_RATES
+
+    parser = argparse.ArgumentParser(description="Render fixed agent phrases to PCM")
+    parser.add_argument("--speaker", action="append", default=None)
+    parser.add_argument("--sample-rate", type=int, action="append", default=None)
+    parser.add_argument("--out", default=str(PROMPTS_DIR))
+    args = parser.parse_args()
+
+    for speaker in args.speaker or ["baya"]:
+        for sample_rate in args.sample_rate or [TELEPHONY_SAMPLE_RATES["wideband"]]:
+            print("Rendered", render_prompts(speaker, sample_rate, Path(args.out)))
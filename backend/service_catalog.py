@@ -0,0 +1,126 @@
+"""Worker-level cache of the clinic service catalog.
+
+The catalog (/api/v2/service, ~460 items) almost never changes, so it is
+fetched once per worker and served from memory. After ``ttl_s`` the
+cached copy is still returned immediately while a background task
+refreshes it (stale-while-revalidate). If the CRM is down the last good
+catalog keeps being served.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from crm_client import crm
+from http_pool import close_session
+
+logger = logging.getLogger("service_catalog")
+
+SERVICE_CATALOG_TTL_S = float(os.getenv("SERVICE_CATALOG_TTL_S", "3600"))
+# Прогрев идёт внутри initialize_process_timeout LiveKit (10 с) — не больше этого бюджета
+SERVICE_CATALOG_WARM_S = float(os.getenv("SERVICE_CATALOG_WARM_S", "2.5"))
+
+
+class ServiceCatalog:
+    def __init__(self, ttl_s: float = SERVICE_CATALOG_TTL_S):
+        self.ttl_s = ttl_s
+        self._data: Any = None
+        self._fetched_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    @property
+    def age_s(self) -> float:
+        return time.monotonic() - self._fetched_at if self._data is not None else float("inf")
+
+    def items(self) -> list[dict]:
+        """Cached services as a list (empty until the first fetch)."""
+        data = self._data
+        if isinstance(data, dict):
+            data = data.get("data", [])
+        return data or []
+
+    async def get(self) -> Any:
+        if self._data is None:
+            self.misses += 1
+            await self._refresh_once()
+        else:
+            self.hits += 1
+            if self.age_s > self.ttl_s:
+                self._refresh_in_background()
+        return self._data
+
+    async def refresh(self, retries: Optional[int] = None) -> None:
+        data = await crm.get_services(retries=retries)
+        self._data = data
+        self._fetched_at = time.monotonic()
+        self.refreshes += 1
+        logger.info(f"Service catalog refreshed: {len(self.items())} services")
+
+    async def _refresh_once(self) -> None:
+        # Одновременные промахи ждут один и тот же запрос к CRM
+        task = self._current_refresh()
+        if task is None:
+            task = self._refreshing = asyncio.create_task(self.refresh())
+        await asyncio.shield(task)
+
+    def prefetch(self) -> None:
+        """Start loading the catalog in the background if it is missing or stale."""
+        if self._data is None or self.age_s > self.ttl_s:
+            self._refresh_in_background()
+
+    def _refresh_in_background(self) -> None:
+        if self._current_refresh() is not None:
+            return
+        self._refreshing = asyncio.create_task(self.refresh())
+        self._refreshing.add_done_callback(self._on_background_done)
+
+    def _current_refresh(self) -> Optional[asyncio.Task]:
+        task = self._refreshing
+        # Задача от другого event loop (например, прогрева) нам не годится
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.refresh_errors += 1
+            logger.warning(f"Service catalog refresh failed, serving stale copy: {task.exception()}")
+
+    def warm(self, budget_s: float = SERVICE_CATALOG_WARM_S) -> None:
+        """Blocking first fetch for worker start-up (outside any event loop).
+
+        One attempt, cut off after ``budget_s``; on failure the catalog is
+        fetched at job start instead.
+        """
+
+        async def _warm():
+            try:
+                await asyncio.wait_for(self.refresh(retries=0), budget_s)
+            finally:
+                await close_session()
+
+        try:
+            asyncio.run(_warm())
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Service catalog warm-up failed, will fetch at job start: {e!r}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "services": len(self.items()),
+            "age_s": round(self.age_s, 1) if self._data is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+service_catalog = ServiceCatalog()
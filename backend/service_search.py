@@ -0,0 +1,212 @@
+"""In-memory search over the clinic service catalog.
+
+Instead of handing the LLM the whole catalog, ``search_services`` returns
+the top-k services for a free-form query ("пломба", "вырвать зуб
+мудрости", "чистка зубов").
+
+Titles and categories are tokenized, lower-cased (ё -> е) and reduced to
+lemmas with pymorphy3 (in requirements.txt; pymorphy2 also works). The
+light suffix stemmer is only a fallback for dev setups without it. Query words are expanded with clinic synonyms.
+Words that are not in the index are matched fuzzily against its
+vocabulary.
+"""
+import difflib
+import logging
+import math
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Optional
+
+logger = logging.getLogger("service_search")
+
+try:
+    import pymorphy3 as _pymorphy
+except ImportError:
+    try:
+        import pymorphy2 as _pymorphy
+    except ImportError:
+        _pymorphy = None
+
+_morph = _pymorphy.MorphAnalyzer() if _pymorphy is not None else None
+
+_WORD = re.compile(r"[а-яa-z0-9]+")
+
+_STOPWORDS = {
+    "в", "во", "на", "и", "с", "со", "по", "при", "для", "из", "от", "до", "под", "без", "к", "ко", "о", "об",
+    "одного", "одной", "один", "одна", "зуб", "зуба", "зубов", "зубы", "мне", "нужно", "надо", "хочу", "хотел",
+    "хотела", "бы", "у", "меня", "как", "или", "а", "не",
+}
+
+# Окончания для запасного стеммера, от длинных к коротким
+_SUFFIXES = sorted(
+    {
+        "иями", "ями", "ами", "ием", "ией", "иях", "ого", "его", "ому", "ему", "ыми", "ими", "ая", "яя", "ое", "ее",
+        "ые", "ие", "ый", "ий", "ой", "ей", "ом", "ем", "ам", "ям", "ах", "ях", "ов", "ев", "ию", "ия", "ие", "ий",
+        "ью", "а", "я", "ы", "и", "у", "ю", "е", "о", "ь", "ть", "ать", "ять", "ить", "еть", "ешь", "ишь",
+    },
+    key=len,
+    reverse=True,
+)
+
+# Разговорные слова пациента -> слова из названий услуг
+SYNONYMS = {
+    "пломба": ["пломбирование", "реставрация"],
+    "пломбу": ["пломбирование", "реставрация"],
+    "вырвать": ["удаление"],
+    "удалить": ["удаление"],
+    "выдернуть": ["удаление"],
+    "мудрости": ["ретинированного", "дистопированного", "удаление"],
+    "чистка": ["гигиена", "профессиональная"],
+    "почистить": ["гигиена", "профессиональная"],
+    "камень": ["зубных", "отложений", "гигиена"],
+    "налет": ["зубных", "отложений", "гигиена"],
+    "отбелить": ["отбеливание"],
+    "имплант": ["имплантация", "имплантат"],
+    "импланты": ["имплантация", "имплантат"],
+    "вставить": ["протезирование", "имплантация"],
+    "протез": ["протезирование"],
+    "коронку": ["коронка"],
+    "брекеты": ["брекет", "ортодонтическая"],
+    "исправить": ["ортодонтическая", "брекет"],
+    "прикус": ["ортодонтическая"],
+    "нерв": ["пульпит", "каналов", "эндодонтическая"],
+    "каналы": ["каналов", "эндодонтическая"],
+    "болит": ["лечение", "консультация"],
+    "осмотр": ["консультация", "осмотр"],
+    "консультацию": ["консультация"],
+    "снимок": ["рентгенография", "снимок"],
+    "рентген": ["рентгенография", "снимок"],
+    "кт": ["томография"],
+    "десна": ["пародонт", "десны"],
+    "десны": ["пародонт", "десны"],
+    "ребенку": ["детский", "молочного"],
+    "ребенок": ["детский", "молочного"],
+    "молочный": ["молочного"],
+    "анестезия": ["анестезия", "обезболивание"],
+    "укол": ["анестезия"],
+}
+
+TITLE_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.4
+FUZZY_WEIGHT = 0.6
+SHORT_TITLE_CHARS = 80
+
+
+@lru_cache(maxsize=20000)
+def lemma(word: str) -> str:
+    if _morph is not None:
+        return _morph.parse(word)[0].normal_form.replace("ё", "е")
+    if len(word) <= 4 or word.isdigit():
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    words = _WORD.findall((text or "").lower().replace("ё", "е"))
+    return [lemma(w) for w in words if w not in _STOPWORDS]
+
+
+def _query_tokens(query: str) -> list[str]:
+    words = _WORD.findall((query or "").lower().replace("ё", "е"))
+    expanded = []
+    for w in words:
+        expanded.append(w)
+        expanded.extend(SYNONYMS.get(w, ()))
+    seen = set()
+    tokens = []
+    for w in expanded:
+        if w in _STOPWORDS:
+            continue
+        t = lemma(w)
+        if t not in seen:
+            seen.add(t)
+            tokens.append(t)
+    return tokens
+
+
+def short_title(title: str, limit: int = SHORT_TITLE_CHARS) -> str:
+    title = " ".join((title or "").split())
+    if len(title) <= limit:
+        return title
+    cut = title.rfind(" ", 0, limit)
+    return title[: cut if cut > 0 else limit].rstrip(",;:—- ") + "…"
+
+
+def format_price(price: Any) -> Optional[str]:
+    """``{"range": ["450.00", "900.00"]}`` -> ``"450–900 ₽"``."""
+    if not isinstance(price, dict):
+        return None
+    values = []
+    for v in price.get("range") or []:
+        try:
+            values.append(float(v))
+        except (TypeError, ValueError):
+            pass
+    if not values:
+        return None
+    low, high = min(values), max(values)
+    fmt = lambda x: f"{x:.0f}" if x == int(x) else f"{x:.2f}"
+    return f"{fmt(low)} ₽" if low == high else f"{fmt(low)}–{fmt(high)} ₽"
+
+
+class ServiceIndex:
+    """Inverted index of lemmas -> services with idf weights."""
+
+    def __init__(self, services: list[dict]):
+        self.services = services
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        for i, service in enumerate(services):
+            for token in tokenize(service.get("title", "")):
+                self._postings[token][i] = max(self._postings[token].get(i, 0.0), TITLE_WEIGHT)
+            for token in tokenize(service.get("category") or ""):
+                self._postings[token].setdefault(i, CATEGORY_WEIGHT)
+        n = max(1, len(services))
+        self._idf = {t: math.log(1 + n / len(p)) for t, p in self._postings.items()}
+        self._vocab = list(self._postings)
+
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        if token in self._postings:
+            return [(token, 1.0)]
+        # Префикс: "пломб" ~ "пломбирование"
+        if len(token) >= 4:
+            prefixed = [t for t in self._vocab if t.startswith(token) or (token.startswith(t) and len(t) >= 4)]
+            if prefixed:
+                return [(t, 0.8) for t in prefixed[:5]]
+        # Опечатки и неточное распознавание речи
+        return [(t, FUZZY_WEIGHT) for t in difflib.get_close_matches(token, self._vocab, n=3, cutoff=0.75)]
+
+    def search(self, query: str, top_k: int = 5) -> list[dict]:
+        scores: dict[int, float] = defaultdict(float)
+        for token in _query_tokens(query):
+            for term, weight in self._expand(token):
+                idf = self._idf[term]
+                for i, field_weight in self._postings[term].items():
+                    scores[i] += idf * weight * field_weight
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], len(self.services[kv[0]].get("title", ""))))
+        return [self._result(self.services[i]) for i, _ in ranked[:top_k]]
+
+    @staticmethod
+    def _result(service: dict) -> dict:
+        return {
+            "id": service.get("id"),
+            "title": short_title(service.get("title", "")),
+            "price": format_price(service.get("price")),
+        }
+
+
+_index: Optional[ServiceIndex] = None
+_indexed_data: Any = None
+
+
+def index_for(services: list[dict]) -> ServiceIndex:
+    """Index over the given catalog, rebuilt only when the catalog object changes."""
+    global _index, _indexed_data
+    if _index is None or services is not _indexed_data:
+        _index = ServiceIndex(services)
+        _indexed_data = services
+        logger.info(f"Service index built: {len(services)} services, {len(_index._vocab)} terms")
+    return _index
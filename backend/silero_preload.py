@@ -0,0 +1,9 @@
+"""Loads the Silero model once in the LiveKit forkserver.
+
+Listed in AgentServer(preload_modules=...), so it is imported before job
+processes are forked and every call shares the weights copy-on-write.
+"""
+from tts_silero import check_model_artifact, model_registry
+
+check_model_artifact("v5_ru")
+model_registry.preload("ru", "v5_ru", "cpu")
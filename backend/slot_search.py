@@ -0,0 +1,116 @@
+"""Earliest free slots across every doctor of a specialty.
+
+"Любой терапевт, как можно раньше" used to take one get_date call per
+doctor, each with its own LLM round-trip. find_earliest_slots queries
+all doctors of the specialty concurrently. At most
+``SLOT_SEARCH_CONCURRENCY`` CRM requests run at once. Whatever has
+arrived by ``SLOT_SEARCH_DEADLINE_S`` is merged into one answer.
+"""
+import asyncio
+import datetime
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from availability_cache import availability
+from crm_client import CrmError
+from doctors import Doctor, doctors_by_specialty
+from prefetch import CLINIC_TZ, PREFETCH_DAYS, AvailabilityPrefetcher
+from tool_results import say_day, shape_dates, time_slots
+from tts_normalize import say_time
+
+logger = logging.getLogger("slot_search")
+
+SLOT_SEARCH_CONCURRENCY = int(os.getenv("SLOT_SEARCH_CONCURRENCY", "4"))
+SLOT_SEARCH_DEADLINE_S = float(os.getenv("SLOT_SEARCH_DEADLINE_S", "4"))
+# Сколько ближайших дат врача смотреть, если в первой все слоты заняты
+SLOT_SEARCH_DATES_PER_DOCTOR = 2
+
+
+async def _doctor_slots(
+    doctor: Doctor,
+    limit: int,
+    from_date: str,
+    to_date: str,
+    semaphore: asyncio.Semaphore,
+    prefetcher: Optional[AvailabilityPrefetcher],
+) -> list[dict]:
+    source = prefetcher or availability
+
+    async with semaphore:
+        if prefetcher is not None:
+            # Времена грузим ниже сами, под семафором, а не фоновым префетчем
+            dates = await prefetcher.get_dates(doctor.doc_id, from_date, to_date, prefetch_times=False)
+        else:
+            dates = await availability.get_dates(doctor.doc_id, from_date, to_date)
+    nearest = shape_dates(dates, limit=SLOT_SEARCH_DATES_PER_DOCTOR, from_date=from_date, to_date=to_date)["dates"]
+
+    slots = []
+    for d in nearest:
+        async with semaphore:
+            times = await source.get_times(doctor.doc_id, d["date"])
+        day = datetime.date.fromisoformat(d["date"])
+        for value, hm in time_slots(times, d["date"])[:limit - len(slots)]:
+            slots.append({
+                "doc_id": doctor.doc_id,
+                "doctor": doctor.name,
+                "date": d["date"],
+                "value": value,
+                "say": f"{say_day(day)}, в {say_time(*hm)}",
+                "_key": (d["date"], hm),
+            })
+        if len(slots) >= limit:
+            break
+    return slots
+
+
+async def find_earliest_slots(
+    specialty: str,
+    limit: int = 3,
+    days: int = PREFETCH_DAYS,
+    prefetcher: Optional[AvailabilityPrefetcher] = None,
+    deadline_s: float = SLOT_SEARCH_DEADLINE_S,
+) -> dict[str, Any]:
+    doctors = doctors_by_specialty(specialty)
+    if not doctors:
+        return {"slots": [], "message": f"Специальность «{specialty}» не найдена"}
+
+    today = datetime.datetime.now(CLINIC_TZ).date()
+    from_date, to_date = today.isoformat(), (today + datetime.timedelta(days=days - 1)).isoformat()
+    semaphore = asyncio.Semaphore(SLOT_SEARCH_CONCURRENCY)
+    started = time.perf_counter()
+
+    tasks = {
+        asyncio.create_task(_doctor_slots(d, limit, from_date, to_date, semaphore, prefetcher)): d
+        for d in doctors
+    }
+    done, pending = await asyncio.wait(tasks, timeout=deadline_s)
+    for task in pending:
+        task.cancel()
+    # Дожидаемся отмены, чтобы не оставлять висящих задач
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    slots, failed = [], []
+    for task in done:
+        doctor = tasks[task]
+        if task.exception() is not None:
+            if not isinstance(task.exception(), CrmError):
+                logger.error(f"Slot search failed for doc_id={doctor.doc_id}", exc_info=task.exception())
+            failed.append(doctor.doc_id)
+            continue
+        slots.extend(task.result())
+
+    slots.sort(key=lambda s: s["_key"])
+    for s in slots:
+        del s["_key"]
+    result: dict[str, Any] = {"slots": slots[:limit]}
+    unanswered = [tasks[t].doc_id for t in pending] + failed
+    if unanswered:
+        result["unavailable_doc_ids"] = unanswered
+
+    logger.info(
+        f"Slot search '{specialty}': {len(doctors)} doctors, {len(slots)} slots, "
+        f"{len(unanswered)} unanswered in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return result
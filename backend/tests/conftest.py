@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Модули backend импортируются плоско (как в Dockerfile с WORKDIR /app)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,74 @@
+import pytest
+
+from service_search import ServiceIndex, format_price, short_title
+
+# Небольшой срез каталога /service в формате CRM
+SERVICES = [
+    {"id": "101", "title": "Консультация врача-стоматолога терапевта первичная", "category": "Терапия",
+     "price": {"currencyCode": "RUB", "range": ["0.00", "0.00"]}},
+    {"id": "102", "title": "Восстановление зуба пломбой из фотополимерного материала", "category": "Терапия",
+     "price": {"currencyCode": "RUB", "range": ["4500.00", "6500.00"]}},
+    {"id": "103", "title": "Пломбирование корневого канала зуба гуттаперчей", "category": "Эндодонтия",
+     "price": {"currencyCode": "RUB", "range": ["3000.00", "3000.00"]}},
+    {"id": "201", "title": "Удаление зуба простое", "category": "Хирургия",
+     "price": {"currencyCode": "RUB", "range": ["2500.00", "2500.00"]}},
+    {"id": "202", "title": "Удаление ретинированного дистопированного зуба мудрости", "category": "Хирургия",
+     "price": {"currencyCode": "RUB", "range": ["9000.00", "12000.00"]}},
+    {"id": "301", "title": "Профессиональная гигиена полости рта и зубов (снятие зубных отложений)",
+     "category": "Гигиена", "price": {"currencyCode": "RUB", "range": ["5500.00", "5500.00"]}},
+    {"id": "401", "title": "Установка брекет-системы на один зубной ряд", "category": "Ортодонтия",
+     "price": {"currencyCode": "RUB", "range": ["45000.00", "45000.00"]}},
+    {"id": "501", "title": "Имплантация зубного имплантата", "category": "Имплантология", "price": None},
+]
+
+
+@pytest.mark.parametrize(
+    "query, expected_ids",
+    [
+        ("пломба", {"102", "103"}),
+        ("вырвать зуб", {"201", "202"}),
+        ("вырвать зуб мудрости", {"202"}),
+        ("чистка зубов", {"301"}),
+        ("брекеты", {"401"}),
+        ("имплант", {"501"}),
+        # Опечатка распознавания речи
+        ("удолениее", {"201", "202"}),
+    ],
+)
+def test_search_finds_service(query, expected_ids):
+    results = ServiceIndex(SERVICES).search(query, top_k=len(expected_ids))
+    assert {r["id"] for r in results} == expected_ids
+
+
+def test_search_result_shape():
+    (result,) = ServiceIndex(SERVICES).search("чистка зубов", top_k=1)
+    assert result == {
+        "id": "301",
+        "title": "Профессиональная гигиена полости рта и зубов (снятие зубных отложений)",
+        "price": "5500 ₽",
+    }
+
+
+def test_search_without_matches_is_empty():
+    assert ServiceIndex(SERVICES).search("парковка") == []
+
+
+@pytest.mark.parametrize(
+    "price, spoken",
+    [
+        ({"range": ["450.00", "450.00"]}, "450 ₽"),
+        ({"range": ["450.00", "900.50"]}, "450–900.50 ₽"),
+        ({"range": []}, None),
+        (None, None),
+    ],
+)
+def test_format_price(price, spoken):
+    assert format_price(price) == spoken
+
+
+def test_short_title_cuts_on_word_boundary():
+    title = "Удаление ретинированного дистопированного зуба мудрости со сложным доступом и выкраиванием лоскута"
+    short = short_title(title, limit=50)
+    assert short.endswith("…")
+    assert len(short) <= 51
+    assert title.startswith(short[:-1])
@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tool_results import shape_dates, shape_times, time_slots
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _load(name: str):
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def test_shape_dates_reads_only_free_days():
+    assert shape_dates(_load("crm_dates.json")) == {
+        "dates": [
+            {"date": "2026-01-15", "say": "пятнадцатое января, четверг"},
+            {"date": "2026-01-16", "say": "шестнадцатое января, пятница"},
+            {"date": "2026-01-20", "say": "двадцатое января, вторник"},
+        ]
+    }
+
+
+def test_shape_dates_window_and_limit():
+    data = _load("crm_dates.json")
+    assert [d["date"] for d in shape_dates(data, to_date="2026-01-16")["dates"]] == ["2026-01-15", "2026-01-16"]
+    assert shape_dates(data, limit=1)["more"] == 2
+    # Границы не в ISO игнорируются
+    assert len(shape_dates(data, from_date="завтра")["dates"]) == 3
+
+
+def test_shape_times_ignores_end_and_metadata():
+    assert shape_times(_load("crm_times.json"), "2026-01-15") == {
+        "date": "2026-01-15",
+        "times": [
+            {"value": "2026-01-15T09:30:00", "say": "девять тридцать"},
+            {"value": "2026-01-15T14:00:00", "say": "четырнадцать часов"},
+            {"value": "2026-01-15T16:05:00", "say": "шестнадцать ноль пять"},
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        ["10:00", "09:00"],
+        {"data": ["10:00", "09:00"]},
+        [{"time": "10:00", "end": "10:30"}, {"time": "09:00", "end": "09:30"}],
+    ],
+)
+def test_bare_times_get_the_requested_date(payload):
+    assert time_slots(payload, "2026-01-15") == [("2026-01-15T09:00", (9, 0)), ("2026-01-15T10:00", (10, 0))]
+
+
+@pytest.mark.parametrize("payload", [None, {}, {"data": None}, "2026-01-15", {"error": "2026-01-15"}])
+def test_unexpected_payload_is_empty(payload):
+    assert shape_dates(payload) == {"dates": []}
+    assert shape_times(payload) == {"times": []}
@@ -0,0 +1,56 @@
+import pytest
+
+from tts_normalize import normalize_ru, say_decimal
+
+
+@pytest.mark.parametrize(
+    "text, spoken",
+    [
+        # Падеж даты задаётся окончанием порядкового, а без него — предлогом
+        ("до 1-го января", "до первого января"),
+        ("1-го января", "первого января"),
+        ("1-е мая", "первое мая"),
+        ("на 15 января", "на пятнадцатое января"),
+        ("к 2 марта", "к второму марта"),
+        # Точка между разрядами — группировка, а не дробь
+        ("1.500 рублей", "тысяча пятьсот рублей"),
+        ("от 1.500 руб.", "от тысячи пятисот рублей"),
+        ("10 000 ₽", "десять тысяч рублей"),
+        ("итого 1.500", "итого тысяча пятьсот"),
+        ("99,90 ₽", "девяносто девять рублей девяносто копеек"),
+        # Десятичные дроби
+        ("2,5 часа", "два с половиной часа"),
+        ("1,5 часа", "полтора часа"),
+        ("до 2,5 часов", "до двух с половиной часов"),
+        ("3,14", "три целых четырнадцать сотых"),
+        ("0,25", "ноль целых двадцать пять сотых"),
+        # Родительный после у/для/без/из
+        ("у 2 врачей", "у двух врачей"),
+        ("для 5 пациентов", "для пяти пациентов"),
+        ("без 3 минут", "без трёх минут"),
+        ("из 21 кабинета", "из двадцати одного кабинета"),
+        # Время
+        ("с 9:00 до 18:00", "с девяти часов до восемнадцати часов"),
+        ("в 14:30", "в четырнадцать тридцать"),
+    ],
+)
+def test_normalize_ru(text, spoken):
+    assert normalize_ru(text) == spoken
+
+
+@pytest.mark.parametrize(
+    "whole, fraction, case, spoken",
+    [
+        (1, "1", "nom", "одна целая одна десятая"),
+        (2, "05", "nom", "две целых пять сотых"),
+        (1, "5", "gen", "полутора"),
+        (3, "25", "dat", "трём целым двадцати пяти сотым"),
+    ],
+)
+def test_say_decimal(whole, fraction, case, spoken):
+    assert say_decimal(whole, fraction, case) == spoken
+
+
+def test_text_without_digits_is_unchanged():
+    text = "Запишу вас к стоматологу."
+    assert normalize_ru(text) is text
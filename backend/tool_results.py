@@ -0,0 +1,134 @@
+"""Shapes CRM payloads into compact tool results for the LLM.
+
+The raw /date and /time responses carry more than the dialog needs and
+make the LLM parse ISO values and verbalize them itself. Here they are
+reduced to the values plus ready-to-speak Russian strings:
+
+    shape_dates(...) -> {"dates": [{"date": "2026-01-15", "say": "пятнадцатое января, четверг"}]}
+    shape_times(...) -> {"date": "2026-01-15", "times": [{"value": "2026-01-15T14:00:00", "say": "четырнадцать часов"}]}
+
+``value`` is passed back to the CRM unchanged (e.g. as create_booking
+date_and_time). Serialized with orjson when installed.
+
+Only the fields that carry a free day or a slot start are read, so
+timestamps such as ``createdAt`` or a slot's ``end`` never turn into
+offered times. Both endpoints answer with a list, bare or under
+``"data"``:
+
+    /date: ["2026-01-15", ...] or [{"date": "2026-01-15", "isBusy": false}, ...]
+    /time: ["14:00", ...] or [{"datetime": "2026-01-15T14:00:00", "end": ...}, ...]
+"""
+import datetime
+import json
+import os
+import re
+from typing import Any, Iterable, Optional
+
+from tts_normalize import say_date, say_time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAX_DATES = int(os.getenv("TOOL_MAX_DATES", "14"))
+MAX_TIMES = int(os.getenv("TOOL_MAX_TIMES", "24"))
+
+_WEEKDAYS = ["понедельник", "вторник", "среда", "четверг", "пятница", "суббота", "воскресенье"]
+
+_ISO_DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+_ISO_DATETIME = re.compile(r"^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})")
+_TIME = re.compile(r"^(\d{1,2}):(\d{2})(?::\d{2})?$")
+
+# Поля CRM с днём приёма и с началом слота (как "datetime" в POST /visit)
+_DATE_KEYS = ("date",)
+_SLOT_KEYS = ("datetime", "dateTime", "time", "start", "startAt")
+# Поля CRM, по которым день или слот помечен занятым
+_UNAVAILABLE_KEYS = ("isBusy", "busy", "disabled")
+
+
+def dumps(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _values(data: Any, keys: tuple[str, ...]) -> Iterable[str]:
+    """The day/slot string of every free entry: the entry itself or its first ``keys`` field."""
+    if isinstance(data, dict):
+        data = data.get("data")
+    if not isinstance(data, list):
+        return
+    for entry in data:
+        if isinstance(entry, dict):
+            if any(entry.get(k) for k in _UNAVAILABLE_KEYS) or entry.get("available") is False:
+                continue
+            entry = next((entry[k] for k in keys if isinstance(entry.get(k), str)), None)
+        if isinstance(entry, str):
+            yield entry
+
+
+def say_day(date: datetime.date) -> str:
+    return f"{say_date(date.day, date.month)}, {_WEEKDAYS[date.weekday()]}"
+
+
+def shape_dates(
+    data: Any, limit: int = MAX_DATES, from_date: Optional[str] = None, to_date: Optional[str] = None
+) -> dict:
+    """Free dates from a /date payload, optionally limited to [from_date, to_date] (ISO)."""
+    # Границы не в ISO (LLM может прислать что угодно) не применяем
+    from_date = from_date if from_date and _ISO_DATE.match(from_date) else None
+    to_date = to_date if to_date and _ISO_DATE.match(to_date) else None
+    dates: dict[str, datetime.date] = {}
+    for s in _values(data, _DATE_KEYS):
+        m = _ISO_DATE.match(s) or _ISO_DATETIME.match(s)
+        if not m:
+            continue
+        try:
+            d = datetime.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+        except ValueError:
+            continue
+        iso = d.isoformat()
+        if (from_date and iso < from_date) or (to_date and iso > to_date):
+            continue
+        dates.setdefault(iso, d)
+
+    ordered = sorted(dates.items())
+    result: dict[str, Any] = {"dates": [{"date": iso, "say": say_day(d)} for iso, d in ordered[:limit]]}
+    if len(ordered) > limit:
+        result["more"] = len(ordered) - limit
+    return result
+
+
+def time_slots(data: Any, date: Optional[str] = None) -> list[tuple[str, tuple[int, int]]]:
+    """(value for create_booking, (hours, minutes)) for every free slot, earliest first.
+
+    Bare "HH:MM" slots are turned into "<date>THH:MM" so the value can be
+    passed to create_booking as is.
+    """
+    slots: dict[str, tuple[int, int]] = {}
+    for s in _values(data, _SLOT_KEYS):
+        m = _ISO_DATETIME.match(s)
+        if m:
+            hm = (int(m.group(4)), int(m.group(5)))
+        else:
+            m = _TIME.match(s)
+            if not m:
+                continue
+            hm = (int(m.group(1)), int(m.group(2)))
+            if date:
+                s = f"{date}T{hm[0]:02d}:{hm[1]:02d}"
+        if hm[0] < 24 and hm[1] < 60:
+            slots.setdefault(s, hm)
+    return sorted(slots.items(), key=lambda kv: kv[1])
+
+
+def shape_times(data: Any, date: Optional[str] = None, limit: int = MAX_TIMES) -> dict:
+    ordered = time_slots(data, date)
+    result: dict[str, Any] = {}
+    if date:
+        result["date"] = date
+    result["times"] = [{"value": value, "say": say_time(*hm)} for value, hm in ordered[:limit]]
+    if len(ordered) > limit:
+        result["more"] = len(ordered) - limit
+    return result
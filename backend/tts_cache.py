@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger("tts_cache")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: NFC, lowercase, collapsed whitespace."""
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.lower().split())
+
+
+class AudioCache:
+    """Content-addressed LRU cache of synthesized PCM audio.
+
+    Two tiers: an in-memory LRU bounded by ``max_bytes`` and an optional
+    on-disk directory bounded by ``max_disk_bytes`` that survives restarts.
+    Both tiers evict least recently used entries once they exceed their size.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._mem: OrderedDict[str, bytes] = OrderedDict()
+        self._mem_bytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk_dir = Path(disk_dir) if disk_dir else None
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        if self._disk_dir is not None:
+            self._scan_disk()
+
+    @staticmethod
+    def make_key(text: str, **params) -> str:
+        """Build a cache key from normalized text and synthesis parameters."""
+        parts = [normalize_text(text)]
+        parts += [f"{name}={params[name]}" for name in sorted(params)]
+        return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get_memory(self, key: str) -> Optional[bytes]:
+        """Memory-tier lookup only; cheap enough to call on the event loop."""
+        with self._lock:
+            pcm = self._mem.get(key)
+            if pcm is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+            return pcm
+
+    def get(self, key: str) -> Optional[bytes]:
+        pcm = self.get_memory(key)
+        if pcm is not None:
+            return pcm
+
+        pcm = self._read_disk(key)
+        with self._lock:
+            if pcm is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, pcm)
+        return pcm
+
+    def put(self, key: str, pcm: bytes) -> None:
+        with self._lock:
+            self._put_memory(key, pcm)
+        self._write_disk(key, pcm)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._mem),
+                "bytes": self._mem_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    # --- memory tier (caller holds the lock) ---
+
+    def _put_memory(self, key: str, pcm: bytes) -> None:
+        if len(pcm) > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= len(old)
+        self._mem[key] = pcm
+        self._mem_bytes += len(pcm)
+        while self._mem_bytes > self.max_bytes:
+            _, evicted = self._mem.popitem(last=False)
+            self._mem_bytes -= len(evicted)
+            self.evictions += 1
+
+    # --- disk tier ---
+
+    def _path(self, key: str) -> Path:
+        return self._disk_dir / key[:2] / f"{key}.pcm"
+
+    def _scan_disk(self) -> None:
+        files = sorted(self._disk_dir.glob("*/*.pcm"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._disk[path.stem] = size
+            self._disk_bytes += size
+        logger.info(f"Audio cache: {len(self._disk)} entries on disk ({self._disk_bytes} bytes)")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self._disk_dir is None:
+            return None
+        with self._lock:
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+
+    def _write_disk(self, key: str, pcm: bytes) -> None:
+        if self._disk_dir is None or len(pcm) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".tmp{threading.get_ident()}")
+            tmp.write_bytes(pcm)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Audio cache: failed to write {path}: {e}")
+            return
+
+        evicted = []
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(pcm)
+            self._disk_bytes += len(pcm)
+            while self._disk_bytes > self.max_disk_bytes:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self.evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                self._path(old_key).unlink()
+            except OSError:
+                pass
+
+
+# Process-wide cache shared by every LocalSileroTTS in the worker.
+# The on-disk tier lives in SILERO_CACHE_DIR (./audio_cache by default) and
+# outlives calls and restarts; set SILERO_CACHE_DIR= (empty) to disable it.
+CACHE_DIR = os.getenv("SILERO_CACHE_DIR", str(Path(__file__).parent / "audio_cache"))
+
+audio_cache = AudioCache(
+    max_bytes=int(os.getenv("SILERO_CACHE_MB", "64")) * 1024 * 1024,
+    disk_dir=CACHE_DIR or None,
+    max_disk_bytes=int(os.getenv("SILERO_CACHE_DISK_MB", "512")) * 1024 * 1024,
+)
@@ -0,0 +1,444 @@
+"""Russian text normalization for TTS: digits, dates, times, prices and
+phone numbers are spelled out in words before they reach Silero.
+
+    normalize_ru("Запись на 15 января в 14:30, цена 450 ₽")
+    -> "Запись на пятнадцатое января в четырнадцать тридцать, цена четыреста пятьдесят рублей"
+
+Every converter is memoized on its token (plus grammatical case), so the
+same dates, times and prices are converted once per worker.
+"""
+import re
+from functools import lru_cache
+
+# --- числительные ---
+
+_UNITS = ["", "один", "два", "три", "четыре", "пять", "шесть", "семь", "восемь", "девять"]
+_UNITS_F = ["", "одна", "две"]
+_UNITS_N = ["", "одно", "два"]
+_TEENS = [
+    "десять", "одиннадцать", "двенадцать", "тринадцать", "четырнадцать",
+    "пятнадцать", "шестнадцать", "семнадцать", "восемнадцать", "девятнадцать",
+]
+_TENS = ["", "", "двадцать", "тридцать", "сорок", "пятьдесят", "шестьдесят", "семьдесят", "восемьдесят", "девяносто"]
+_HUNDREDS = ["", "сто", "двести", "триста", "четыреста", "пятьсот", "шестьсот", "семьсот", "восемьсот", "девятьсот"]
+
+# Косвенные падежи: "с девяти", "к двум", "от тысячи пятисот"
+_UNITS_CASE = {
+    "gen": ["", "одного", "двух", "трёх", "четырёх", "пяти", "шести", "семи", "восьми", "девяти"],
+    "dat": ["", "одному", "двум", "трём", "четырём", "пяти", "шести", "семи", "восьми", "девяти"],
+    "prep": ["", "одном", "двух", "трёх", "четырёх", "пяти", "шести", "семи", "восьми", "девяти"],
+}
+_ONE_F_CASE = {"gen": "одной", "dat": "одной", "prep": "одной"}
+_TEENS_OBLIQUE = [w[:-1] + "и" for w in _TEENS]
+_TENS_OBLIQUE = [
+    "", "", "двадцати", "тридцати", "сорока", "пятидесяти", "шестидесяти", "семидесяти", "восьмидесяти", "девяноста",
+]
+_HUNDREDS_CASE = {
+    "gen": ["", "ста", "двухсот", "трёхсот", "четырёхсот", "пятисот", "шестисот", "семисот", "восьмисот", "девятисот"],
+    "dat": ["", "ста", "двумстам", "трёмстам", "четырёмстам", "пятистам", "шестистам", "семистам", "восьмистам",
+            "девятистам"],
+    "prep": ["", "ста", "двухстах", "трёхстах", "четырёхстах", "пятистах", "шестистах", "семистах", "восьмистах",
+             "девятистах"],
+}
+
+# (gender, one, few, many, {case: (singular, plural)})
+_SCALES = [
+    (10 ** 9, "m", "миллиард", "миллиарда", "миллиардов",
+     {"gen": ("миллиарда", "миллиардов"), "dat": ("миллиарду", "миллиардам"), "prep": ("миллиарде", "миллиардах")}),
+    (10 ** 6, "m", "миллион", "миллиона", "миллионов",
+     {"gen": ("миллиона", "миллионов"), "dat": ("миллиону", "миллионам"), "prep": ("миллионе", "миллионах")}),
+    (10 ** 3, "f", "тысяча", "тысячи", "тысяч",
+     {"gen": ("тысячи", "тысяч"), "dat": ("тысяче", "тысячам"), "prep": ("тысяче", "тысячах")}),
+]
+
+# Существительные после числа: формы для 1/2/5 в именительном и (ед., мн.) в косвенных падежах
+_NOUNS = {
+    "час": {"nom": ("час", "часа", "часов"), "gen": ("часа", "часов"), "dat": ("часу", "часам"),
+            "prep": ("часе", "часах")},
+    "рубль": {"nom": ("рубль", "рубля", "рублей"), "gen": ("рубля", "рублей"), "dat": ("рублю", "рублям"),
+              "prep": ("рубле", "рублях")},
+    "копейка": {"nom": ("копейка", "копейки", "копеек"), "gen": ("копейки", "копеек"),
+                "dat": ("копейке", "копейкам"), "prep": ("копейке", "копейках")},
+    "процент": {"nom": ("процент", "процента", "процентов"), "gen": ("процента", "процентов"),
+                "dat": ("проценту", "процентам"), "prep": ("проценте", "процентах")},
+}
+
+
+def plural(n: int, one: str, few: str, many: str) -> str:
+    """Pick the noun form agreeing with n: 1 рубль, 2 рубля, 5 рублей."""
+    n = abs(n) % 100
+    if 11 <= n <= 19:
+        return many
+    n %= 10
+    if n == 1:
+        return one
+    if 2 <= n <= 4:
+        return few
+    return many
+
+
+def counted(n: int, noun: str, case: str = "nom") -> str:
+    """Form of a _NOUNS noun after n in the given case: 5 часов, к 5 часам, с 1 часа."""
+    forms = _NOUNS[noun]
+    if case not in _UNITS_CASE:
+        return plural(n, *forms["nom"])
+    if n >= 1000 and n % 1000 == 0:
+        # "к двум тысячам рублей": после тысяч/миллионов всегда родительный мн. ч.
+        return forms["nom"][2]
+    singular, plural_form = forms[case]
+    return singular if n % 10 == 1 and n % 100 != 11 else plural_form
+
+
+def _triplet(n: int, gender: str, case: str = "nom") -> list[str]:
+    if case in _UNITS_CASE:
+        return _triplet_oblique(n, gender, case)
+    words = [_HUNDREDS[n // 100]]
+    n %= 100
+    if 10 <= n <= 19:
+        words.append(_TEENS[n - 10])
+    else:
+        words.append(_TENS[n // 10])
+        unit = n % 10
+        if unit in (1, 2) and gender == "f":
+            words.append(_UNITS_F[unit])
+        elif unit in (1, 2) and gender == "n":
+            words.append(_UNITS_N[unit])
+        else:
+            words.append(_UNITS[unit])
+    return [w for w in words if w]
+
+
+def _triplet_oblique(n: int, gender: str, case: str) -> list[str]:
+    words = [_HUNDREDS_CASE[case][n // 100]]
+    n %= 100
+    if 10 <= n <= 19:
+        words.append(_TEENS_OBLIQUE[n - 10])
+    else:
+        words.append(_TENS_OBLIQUE[n // 10])
+        unit = n % 10
+        words.append(_ONE_F_CASE[case] if unit == 1 and gender == "f" else _UNITS_CASE[case][unit])
+    return [w for w in words if w]
+
+
+@lru_cache(maxsize=4096)
+def cardinal(n: int, gender: str = "m", case: str = "nom") -> str:
+    """Cardinal number: 2026 -> две тысячи двадцать шесть; cardinal(18, case="gen") -> восемнадцати."""
+    if n == 0:
+        return "ноля" if case == "gen" else "нолю" if case == "dat" else "ноле" if case == "prep" else "ноль"
+    if n < 0:
+        return "минус " + cardinal(-n, gender, case)
+
+    words = []
+    for scale, scale_gender, one, few, many, oblique in _SCALES:
+        count, n = divmod(n, scale)
+        if count:
+            # "тысяча пятьсот", а не "одна тысяча пятьсот"
+            if not (count == 1 and scale == 1000 and not words):
+                words += _triplet(count, scale_gender, case)
+            if case in oblique:
+                singular, plural_form = oblique[case]
+                words.append(singular if count % 10 == 1 and count % 100 != 11 else plural_form)
+            else:
+                words.append(plural(count, one, few, many))
+    words += _triplet(n, gender, case)
+    return " ".join(words)
+
+
+# Порядковые: основа + тип окончания (hard: -ый, stressed: -ой, soft: -ий)
+_ORD_UNITS = [
+    None, ("перв", "hard"), ("втор", "stressed"), ("трет", "soft"), ("четвёрт", "hard"),
+    ("пят", "hard"), ("шест", "stressed"), ("седьм", "stressed"), ("восьм", "stressed"), ("девят", "hard"),
+]
+_ORD_TEENS = [
+    ("десят", "hard"), ("одиннадцат", "hard"), ("двенадцат", "hard"), ("тринадцат", "hard"),
+    ("четырнадцат", "hard"), ("пятнадцат", "hard"), ("шестнадцат", "hard"),
+    ("семнадцат", "hard"), ("восемнадцат", "hard"), ("девятнадцат", "hard"),
+]
+_ORD_TENS = [
+    None, None, ("двадцат", "hard"), ("тридцат", "hard"), ("сороков", "stressed"), ("пятидесят", "hard"),
+    ("шестидесят", "hard"), ("семидесят", "hard"), ("восьмидесят", "hard"), ("девяност", "hard"),
+]
+# Родительный падеж для сложных порядковых: двухсотый, трёхтысячный
+_GEN_PREFIX = ["", "", "двух", "трёх", "четырёх", "пяти", "шести", "семи", "восьми", "девяти"]
+
+_ENDINGS = {
+    "hard": {
+        ("m", "nom"): "ый", ("m", "gen"): "ого", ("m", "dat"): "ому", ("m", "prep"): "ом",
+        ("n", "nom"): "ое", ("n", "gen"): "ого", ("n", "dat"): "ому", ("n", "prep"): "ом",
+        ("f", "nom"): "ая", ("f", "gen"): "ой", ("f", "dat"): "ой", ("f", "prep"): "ой", ("f", "acc"): "ую",
+    },
+    "soft": {
+        ("m", "nom"): "ий", ("m", "gen"): "ьего", ("m", "dat"): "ьему", ("m", "prep"): "ьем",
+        ("n", "nom"): "ье", ("n", "gen"): "ьего", ("n", "dat"): "ьему", ("n", "prep"): "ьем",
+        ("f", "nom"): "ья", ("f", "gen"): "ьей", ("f", "dat"): "ьей", ("f", "prep"): "ьей", ("f", "acc"): "ью",
+    },
+}
+
+
+def _ending(kind: str, gender: str, case: str) -> str:
+    # Винительный у неодушевлённых м. и ср. рода совпадает с именительным
+    if case == "acc" and gender != "f":
+        case = "nom"
+    if kind == "stressed":
+        if (gender, case) == ("m", "nom"):
+            return "ой"
+        kind = "hard"
+    return _ENDINGS[kind][(gender, case)]
+
+
+@lru_cache(maxsize=4096)
+def ordinal(n: int, gender: str = "m", case: str = "nom") -> str:
+    """Ordinal number: ordinal(2026, "m", "gen") -> две тысячи двадцать шестого."""
+    if n <= 0 or n >= 10000:
+        return cardinal(n, gender)
+
+    thousands, rest = divmod(n, 1000)
+    if rest == 0:
+        stem, kind = _GEN_PREFIX[thousands] + "тысячн", "hard"
+        return stem + _ending(kind, gender, case)
+
+    # Все разряды кроме последнего произносятся количественными: две тысячи двадцать шестой
+    words = [cardinal(thousands * 1000)] if thousands else []
+    hundreds, tail = divmod(rest, 100)
+    if tail == 0:
+        stem, kind = _GEN_PREFIX[hundreds] + "сот", "hard"
+    else:
+        if hundreds:
+            words.append(_HUNDREDS[hundreds])
+        if 10 <= tail <= 19:
+            stem, kind = _ORD_TEENS[tail - 10]
+        elif tail % 10 == 0:
+            stem, kind = _ORD_TENS[tail // 10]
+        else:
+            if tail > 20:
+                words.append(_TENS[tail // 10])
+            stem, kind = _ORD_UNITS[tail % 10]
+    words.append(stem + _ending(kind, gender, case))
+    return " ".join(words)
+
+
+# --- контекст: падеж по предлогу перед числом ---
+
+_CASE_BY_PREP = {
+    "с": "gen", "со": "gen", "до": "gen", "от": "gen", "после": "gen", "около": "gen", "кроме": "gen",
+    "у": "gen", "для": "gen", "без": "gen", "из": "gen",
+    "к": "dat", "ко": "dat",
+    "о": "prep", "об": "prep", "при": "prep",
+}
+_PREP_BEFORE = re.compile(r"(?:^|\s)([а-яё]+)\s+$", re.IGNORECASE)
+
+
+def _case_before(text: str, pos: int, default: str = "nom") -> str:
+    m = _PREP_BEFORE.search(text[max(0, pos - 12):pos])
+    if m is None:
+        return default
+    return _CASE_BY_PREP.get(m.group(1).lower(), default)
+
+
+# --- даты, время, цены, телефоны ---
+
+_MONTHS = [
+    "января", "февраля", "марта", "апреля", "мая", "июня",
+    "июля", "августа", "сентября", "октября", "ноября", "декабря",
+]
+
+
+@lru_cache(maxsize=1024)
+def say_year(year: int, case: str = "nom") -> str:
+    words = {"nom": "год", "gen": "года", "dat": "году", "prep": "году"}
+    return f"{ordinal(year, 'm', case)} {words[case]}"
+
+
+@lru_cache(maxsize=2048)
+def say_date(day: int, month: int, year: int = 0, case: str = "nom") -> str:
+    text = f"{ordinal(day, 'n', case)} {_MONTHS[month - 1]}"
+    if year:
+        text += " " + say_year(year, "gen")
+    return text
+
+
+@lru_cache(maxsize=2048)
+def say_time(hours: int, minutes: int, case: str = "nom") -> str:
+    """14:30 -> четырнадцать тридцать; с 9:00 (case="gen") -> девяти часов."""
+    if minutes == 0:
+        return f"{cardinal(hours, case=case)} {counted(hours, 'час', case)}"
+    if minutes < 10:
+        return f"{cardinal(hours, case=case)} ноль {cardinal(minutes, case=case)}"
+    return f"{cardinal(hours, case=case)} {cardinal(minutes, case=case)}"
+
+
+@lru_cache(maxsize=2048)
+def say_price(rubles: int, kopecks: int = 0, case: str = "nom") -> str:
+    text = f"{cardinal(rubles, case=case)} {counted(rubles, 'рубль', case)}"
+    if kopecks:
+        text += f" {cardinal(kopecks, 'f', case)} {counted(kopecks, 'копейка', case)}"
+    return text
+
+
+# Знаменатель дроби по числу знаков после запятой: 2,25 -> двадцать пять сотых
+_FRACTIONS = ["десят", "сот", "тысячн", "десятитысячн", "стотысячн", "миллионн"]
+# Окончания (ед., мн.) по падежам: одна целая / две целых, к одной целой / к двум целым
+_FRACTION_ENDINGS = {
+    "nom": ("ая", "ых"), "gen": ("ой", "ых"), "dat": ("ой", "ым"), "prep": ("ой", "ых"),
+}
+
+
+@lru_cache(maxsize=2048)
+def say_decimal(whole: int, fraction: str, case: str = "nom") -> str:
+    """2,5 -> два с половиной; 1,5 -> полтора; 3,14 -> три целых четырнадцать сотых."""
+    if fraction == "5" and whole:
+        if whole == 1:
+            return "полутора" if case in _UNITS_CASE else "полтора"
+        return f"{cardinal(whole, case=case)} с половиной"
+    if len(fraction) > len(_FRACTIONS):
+        return f"{cardinal(whole, case=case)} запятая {_say_group(fraction)}"
+    singular, plural_ending = _FRACTION_ENDINGS.get(case, _FRACTION_ENDINGS["nom"])
+
+    def ending(n: int) -> str:
+        return singular if n % 10 == 1 and n % 100 != 11 else plural_ending
+
+    numerator = int(fraction)
+    return (
+        f"{cardinal(whole, 'f', case)} цел{ending(whole)} "
+        f"{cardinal(numerator, 'f', case)} {_FRACTIONS[len(fraction) - 1]}{ending(numerator)}"
+    )
+
+
+def _say_group(digits: str) -> str:
+    # "05" -> "ноль пять", "851" -> "восемьсот пятьдесят один"
+    words = ["ноль"] * (len(digits) - len(digits.lstrip("0")))
+    if digits.strip("0"):
+        words.append(cardinal(int(digits)))
+    return " ".join(words) if words else "ноль"
+
+
+@lru_cache(maxsize=1024)
+def say_phone(digits: str) -> str:
+    """+79998516692 -> плюс семь, девятьсот девяносто девять, восемьсот пятьдесят один, ..."""
+    head = "плюс семь" if digits[0] == "7" else "восемь"
+    groups = [digits[1:4], digits[4:7], digits[7:9], digits[9:11]]
+    return ", ".join([head] + [_say_group(g) for g in groups])
+
+
+_ORD_SUFFIX = {
+    "й": ("m", "nom"), "ый": ("m", "nom"), "ой": ("m", "nom"), "ий": ("m", "nom"),
+    "го": ("m", "gen"), "му": ("m", "dat"), "м": ("m", "prep"),
+    "е": ("n", "nom"), "я": ("f", "nom"), "ю": ("f", "acc"),
+}
+
+_MONTHS_RE = "|".join(_MONTHS)
+
+_PHONE = re.compile(r"(\+7|(?<!\d)8)[\s\-(]*(\d{3})[\s\-)]*(\d{3})[\s\-]*(\d{2})[\s\-]*(\d{2})(?!\d)")
+_ISO_DATE = re.compile(r"(?<!\d)(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?(?!\d)")
+_DOT_DATE = re.compile(r"(?<![\d.])(\d{1,2})\.(\d{1,2})(?:\.(\d{4}))?(?![\d.]*\d)")
+_WORD_DATE = re.compile(rf"(?<!\d)(\d{{1,2}})(?:-?(го|е))?\s+({_MONTHS_RE})(?:\s+(\d{{4}})(?:\s*(?:года|г\.))?)?", re.IGNORECASE)
+_YEAR = re.compile(r"(?<!\d)(\d{4})\s*(года|году|год|г\.)")
+_TIME = re.compile(r"(?<!\d)([01]?\d|2[0-3]):([0-5]\d)(?::[0-5]\d)?(?!\d)")
+# Разряды отделяются пробелом или точкой: "10 000", "1.500"
+_PRICE = re.compile(r"(?<![\d.,])(\d{1,3}(?:[  ]\d{3})+|\d{1,3}(?:\.\d{3})+(?![.,]?\d)|\d+)(?:[.,](\d{2}))?\s*(₽|RUB|руб(?:\.|л[а-яё]*)?|р\.)", re.IGNORECASE)
+_PERCENT = re.compile(r"(\d+)\s*%")
+_NUMBER_SIGN = re.compile(r"№\s*(\d+)")
+_ORDINAL = re.compile(r"(?<!\d)(\d+)-(" + "|".join(sorted(_ORD_SUFFIX, key=len, reverse=True)) + r")(?![а-яё])")
+_GROUPED = re.compile(r"(?<![\d.,])(?:\d{1,3}(?:[  ]\d{3})+|\d{1,3}(?:\.\d{3})+)(?![\d.,]\d)")
+_DECIMAL = re.compile(r"(\d+)[.,](\d+)")
+_INTEGER = re.compile(r"\d+")
+
+
+def _valid_date(day: int, month: int) -> bool:
+    return 1 <= day <= 31 and 1 <= month <= 12
+
+
+def _iso_date(m: re.Match, text: str) -> str:
+    year, month, day = int(m.group(1)), int(m.group(2)), int(m.group(3))
+    if not _valid_date(day, month):
+        return m.group(0)
+    spoken = say_date(day, month, year, _case_before(text, m.start()))
+    if m.group(4):
+        spoken += " в " + say_time(int(m.group(4)), int(m.group(5)))
+    return spoken
+
+
+def _dot_date(m: re.Match, text: str) -> str:
+    day, month = int(m.group(1)), int(m.group(2))
+    if not _valid_date(day, month):
+        # "14.00" — это время, а не дата
+        if not m.group(3) and day <= 23 and len(m.group(2)) == 2 and month <= 59:
+            return say_time(day, month, _case_before(text, m.start()))
+        return m.group(0)
+    return say_date(day, month, int(m.group(3) or 0), _case_before(text, m.start()))
+
+
+def _word_date(m: re.Match, text: str) -> str:
+    day = int(m.group(1))
+    month = _MONTHS.index(m.group(3).lower()) + 1
+    if not _valid_date(day, month):
+        return m.group(0)
+    # "1-го января" — падеж задан окончанием, "на 1 января" — предлогом
+    if m.group(2):
+        case = "gen" if m.group(2).lower() == "го" else "nom"
+    else:
+        case = _case_before(text, m.start())
+    return say_date(day, month, int(m.group(4) or 0), case)
+
+
+def _year(m: re.Match, text: str) -> str:
+    word = m.group(2)
+    case = {"года": "gen", "г.": "gen", "году": "prep"}.get(word, "nom")
+    return say_year(int(m.group(1)), case)
+
+
+def _ordinal(m: re.Match, text: str) -> str:
+    gender, case = _ORD_SUFFIX[m.group(2)]
+    return ordinal(int(m.group(1)), gender, case)
+
+
+def _time(m: re.Match, text: str) -> str:
+    return say_time(int(m.group(1)), int(m.group(2)), _case_before(text, m.start()))
+
+
+def _price(m: re.Match, text: str) -> str:
+    return say_price(int(re.sub(r"[\s.]", "", m.group(1))), int(m.group(2) or 0), _case_before(text, m.start()))
+
+
+def _percent(m: re.Match, text: str) -> str:
+    n, case = int(m.group(1)), _case_before(text, m.start())
+    return f"{cardinal(n, case=case)} {counted(n, 'процент', case)}"
+
+
+def _grouped(m: re.Match, text: str) -> str:
+    return cardinal(int(re.sub(r"[\s.]", "", m.group(0))), case=_case_before(text, m.start()))
+
+
+def _decimal(m: re.Match, text: str) -> str:
+    return say_decimal(int(m.group(1)), m.group(2), _case_before(text, m.start()))
+
+
+def _integer(m: re.Match, text: str) -> str:
+    return cardinal(int(m.group(0)), case=_case_before(text, m.start()))
+
+
+def _sub(pattern: re.Pattern, fn, text: str) -> str:
+    return pattern.sub(lambda m: fn(m, text), text)
+
+
+@lru_cache(maxsize=8192)
+def normalize_ru(text: str) -> str:
+    """Spell out digits, dates, times, prices and phone numbers in Russian words."""
+    if not any(ch.isdigit() for ch in text):
+        return text
+
+    text = _PHONE.sub(lambda m: say_phone(m.group(1)[-1] + "".join(m.groups()[1:])), text)
+    text = _sub(_ISO_DATE, _iso_date, text)
+    text = _sub(_WORD_DATE, _word_date, text)
+    text = _sub(_DOT_DATE, _dot_date, text)
+    text = _sub(_YEAR, _year, text)
+    # После предлогов числа склоняются: "с девяти до восемнадцати", "к двум часам", "от тысячи рублей"
+    text = _sub(_TIME, _time, text)
+    text = _sub(_PRICE, _price, text)
+    text = _sub(_PERCENT, _percent, text)
+    text = _NUMBER_SIGN.sub(lambda m: "номер " + cardinal(int(m.group(1))), text)
+    text = _sub(_ORDINAL, _ordinal, text)
+    text = _sub(_GROUPED, _grouped, text)
+    text = _sub(_DECIMAL, _decimal, text)
+    text = _sub(_INTEGER, _integer, text)
+    return text
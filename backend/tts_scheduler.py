@@ -0,0 +1,204 @@
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import torch
+
+logger = logging.getLogger("tts_scheduler")
+
+# Приоритеты: первая фраза ответа важнее остальных (время до первого звука)
+PRIORITY_FIRST = 0
+PRIORITY_NEXT = 1
+
+
+class _Job:
+    __slots__ = ("priority", "seq", "fn", "args", "future", "loop", "enqueued_at", "cost")
+
+    def __init__(self, priority, seq, fn, args, future, loop, cost):
+        self.priority = priority
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.loop = loop
+        self.cost = cost
+        self.enqueued_at = time.perf_counter()
+
+    def __lt__(self, other: "_Job") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+def available_cpus() -> int:
+    """CPUs this process may actually use.
+
+    os.cpu_count() reports the host's cores; inside a container the limit is
+    the CPU affinity mask and the cgroup quota (docker ``cpus: '4.0'``).
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, int(quota)))
+    return cpus
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    # cgroup v2: "<quota> <period>" или "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    # cgroup v1
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+class InferenceScheduler:
+    """Bounded pool of threads that run TTS inference by priority.
+
+    Only ``workers`` inferences run at once, each using ``intra_op_threads``
+    torch threads, so concurrent calls don't fight over the same cores.
+    Lower priority values run first; ties run in submission order.
+
+    Jobs whose caller was cancelled (barge-in) while queued are dropped
+    before they reach the model. ``cost`` (e.g. phrase length) lets the
+    scheduler estimate the CPU-seconds such drops saved.
+    """
+
+    def __init__(self, workers: int = 2, intra_op_threads: Optional[int] = None):
+        self.workers = workers
+        self.intra_op_threads = intra_op_threads or max(1, available_cpus() // workers)
+        torch.set_num_threads(self.intra_op_threads)
+
+        self._queue: queue.PriorityQueue[Optional[_Job]] = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._running = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        # CPU-seconds per unit of cost, learned from completed jobs
+        self._cpu_per_cost = 0.0
+        self.cancelled_jobs = 0
+        self.cpu_seconds_saved = 0.0
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"tts-infer-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+        logger.info(f"TTS scheduler: {workers} workers x {self.intra_op_threads} torch threads")
+
+    async def run(
+        self, fn: Callable[..., Any], *args, priority: int = PRIORITY_NEXT, cost: float = 0.0
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Job(priority, next(self._seq), fn, args, future, loop, cost))
+        # Cancelling the awaiting task cancels the future, so the job is skipped if still queued
+        return await future
+
+    def record_cancelled(self, cost: float) -> None:
+        """Count work that was skipped because its stream was cancelled."""
+        with self._lock:
+            self.cancelled_jobs += 1
+            self.cpu_seconds_saved += cost * self._cpu_per_cost
+
+    def metrics(self) -> dict[str, float]:
+        with self._lock:
+            completed = self._completed
+            return {
+                "queue_depth": self._queue.qsize(),
+                "running": self._running,
+                "completed": completed,
+                "wait_avg_ms": (self._wait_total / completed * 1000) if completed else 0.0,
+                "wait_max_ms": self._wait_max * 1000,
+                "cancelled_jobs": self.cancelled_jobs,
+                "cpu_seconds_saved": self.cpu_seconds_saved,
+            }
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            # Stream was cancelled while the job was queued
+            if job.future.cancelled():
+                self.record_cancelled(job.cost)
+                continue
+
+            waited = time.perf_counter() - job.enqueued_at
+            with self._lock:
+                self._running += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            started = time.perf_counter()
+            try:
+                result = job.fn(*job.args)
+            except BaseException as e:
+                job.loop.call_soon_threadsafe(_set_exception, job.future, e)
+            else:
+                job.loop.call_soon_threadsafe(_set_result, job.future, result)
+            finally:
+                # Torch keeps ~intra_op_threads cores busy for the whole inference
+                cpu = (time.perf_counter() - started) * self.intra_op_threads
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    if job.cost > 0:
+                        sample = cpu / job.cost
+                        self._cpu_per_cost = sample if not self._cpu_per_cost else (
+                            0.9 * self._cpu_per_cost + 0.1 * sample
+                        )
+
+
+def _set_result(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+_default_scheduler: Optional[InferenceScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> InferenceScheduler:
+    """Process-wide scheduler shared by every LocalSileroTTS in the worker.
+
+    Sized by SILERO_TTS_WORKERS and SILERO_TTS_THREADS.
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            threads = os.getenv("SILERO_TTS_THREADS")
+            _default_scheduler = InferenceScheduler(
+                workers=int(os.getenv("SILERO_TTS_WORKERS", "2")),
+                intra_op_threads=int(threads) if threads else None,
+            )
+        return _default_scheduler
@@ -1,13 +1,238 @@
-from livekit.agents import tts
+from livekit.agents import tts, utils, APIConnectOptions, DEFAULT_API_CONNECT_OPTIONS
 import numpy as np
+import asyncio
+import math
 import os
 os.environ["TORCH_BACKEND"] = "none"
+import re
+from pathlib import Path
+import threading
 import torch
+import torch.package
 from typing import Optional
 import logging
+from scipy.signal import resample_poly
+
+from tts_cache import AudioCache, audio_cache
+from tts_scheduler import InferenceScheduler, PRIORITY_FIRST, PRIORITY_NEXT, default_scheduler
+from tts_normalize import normalize_ru
 
 logger = logging.getLogger("silero_tts")
 
+# Sentence end: . ! ? … (plus closing quotes/brackets) followed by whitespace.
+_SENTENCE_END = re.compile(r'[.!?…]+["»)]*\s')
+# Clause boundary inside a sentence: , ; : and dashes followed by whitespace.
+_CLAUSE_END = re.compile(r'[,;:—–]\s')
+
+
+class _PhraseSplitter:
+    """Incrementally splits streamed LLM text into phrases for synthesis.
+
+    Text is cut at sentence ends. Long sentences are also cut at clause
+    boundaries, and the very first phrase is cut early so the caller hears
+    audio as soon as possible. No phrase is longer than ``max_chars``, which
+    bounds how long one inference (and so a barge-in cancellation) can take.
+    """
+
+    def __init__(self, first_min_chars: int = 20, clause_min_chars: int = 100, max_chars: int = 200):
+        self._first_min_chars = first_min_chars
+        self._clause_min_chars = clause_min_chars
+        self._max_chars = max_chars
+        self._buf = ""
+        self._emitted = 0
+
+    def push(self, text: str) -> list[str]:
+        self._buf += text
+        phrases = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            phrase = self._buf[:cut].strip()
+            self._buf = self._buf[cut:]
+            if phrase:
+                phrases.append(phrase)
+                self._emitted += 1
+        return phrases
+
+    def flush(self) -> list[str]:
+        phrases = self.push("")
+        while self._buf.strip():
+            cut = self._forced_cut() or len(self._buf)
+            phrase = self._buf[:cut].strip()
+            self._buf = self._buf[cut:]
+            if phrase:
+                phrases.append(phrase)
+                self._emitted += 1
+        self._buf = ""
+        return phrases
+
+    def _find_cut(self) -> Optional[int]:
+        sentence = _SENTENCE_END.search(self._buf)
+        min_chars = self._first_min_chars if self._emitted == 0 else self._clause_min_chars
+        for clause in _CLAUSE_END.finditer(self._buf):
+            if sentence is not None and clause.start() > sentence.start():
+                break
+            if clause.end() >= min_chars:
+                return clause.end()
+        if sentence is not None and sentence.end() <= self._max_chars:
+            return sentence.end()
+        return self._forced_cut()
+
+    def _forced_cut(self) -> Optional[int]:
+        # Cut an over-long phrase at the last space before max_chars
+        if len(self._buf) <= self._max_chars:
+            return None
+        space = self._buf.rfind(" ", 0, self._max_chars)
+        return space + 1 if space > 0 else self._max_chars
+
+
+def audio_to_pcm(audio) -> memoryview:
+    """Convert Silero float audio in [-1, 1] to 16-bit PCM.
+
+    The float buffer is clipped and scaled in place and cast once into a
+    preallocated int16 array, which is returned as a byte memoryview without
+    a further ``tobytes()`` copy.
+    """
+    # Tensor -> numpy shares memory, no copy
+    if isinstance(audio, torch.Tensor):
+        audio = audio.detach().cpu().numpy()
+    audio = np.asarray(audio, dtype=np.float32)
+    if not audio.flags.writeable:
+        audio = audio.copy()
+
+    np.clip(audio, -1.0, 1.0, out=audio)
+    audio *= 32767
+    pcm = np.empty(audio.shape, dtype=np.int16)
+    np.copyto(pcm, audio, casting="unsafe")
+    return memoryview(pcm).cast("B")
+
+
+# Audio is pushed to LiveKit in whole 20 ms frames
+FRAME_MS = 20
+
+
+# Rates Silero v3+ models can synthesize at natively
+SILERO_SAMPLE_RATES = (8000, 24000, 48000)
+# SIP transport presets: G.711 narrowband and G.722 wideband
+TELEPHONY_SAMPLE_RATES = {"narrowband": 8000, "wideband": 16000}
+
+
+def model_sample_rate(output_rate: int) -> int:
+    """Cheapest native Silero rate that covers the requested output rate."""
+    for rate in SILERO_SAMPLE_RATES:
+        if rate >= output_rate:
+            return rate
+    return SILERO_SAMPLE_RATES[-1]
+
+
+# Versioned model artifacts baked into the image (see download_silero_model.py)
+MODEL_DIR = Path(os.getenv("SILERO_MODEL_DIR", Path(__file__).parent / "models"))
+# Dev only: fall back to torch.hub (network + GitHub) when the artifact is missing
+ALLOW_HUB = os.getenv("SILERO_ALLOW_HUB") == "1"
+
+
+def model_artifact_path(model_id: str) -> Path:
+    return MODEL_DIR / f"{model_id}.pt"
+
+
+def check_model_artifact(model_id: str = "v5_ru") -> None:
+    """Fail fast at startup if the local model artifact is missing."""
+    path = model_artifact_path(model_id)
+    if path.exists() and path.stat().st_size > 0:
+        return
+    if ALLOW_HUB:
+        logger.warning(f"Silero model artifact {path} missing, will use torch.hub")
+        return
+    raise SystemExit(
+        f"Silero model artifact {path} is missing. "
+        f"Run `python download_silero_model.py {model_id}` or set SILERO_MODEL_DIR."
+    )
+
+
+class _SharedModel:
+    def __init__(self, model, example_text):
+        self.model = model
+        self.example_text = example_text
+        self.refs = 0
+
+
+class _ModelRegistry:
+    """Process-wide refcounted registry of loaded Silero models.
+
+    Keyed by (language, model_id, device) so every session in a worker shares
+    one copy of the weights. Speaker and accent settings are per-call
+    arguments of ``apply_tts`` and stay on each ``LocalSileroTTS``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: dict[tuple[str, str, str], _SharedModel] = {}
+
+    def acquire(self, language: str, model_id: str, device: torch.device) -> _SharedModel:
+        key = (language, model_id, str(device))
+        with self._lock:
+            shared = self._models.get(key)
+            if shared is None:
+                shared = _SharedModel(*self._load(language, model_id, device))
+                self._models[key] = shared
+            shared.refs += 1
+            return shared
+
+    def release(self, language: str, model_id: str, device: torch.device) -> None:
+        key = (language, model_id, str(device))
+        with self._lock:
+            shared = self._models.get(key)
+            if shared is None:
+                return
+            shared.refs -= 1
+            if shared.refs <= 0:
+                del self._models[key]
+                logger.info(f"Silero model {key} released")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"/".join(key): shared.refs for key, shared in self._models.items()}
+
+    def preload(self, language: str, model_id: str, device: str = "cpu") -> None:
+        """Load a model and pin it for the life of the process.
+
+        Called before job processes are forked so they all share the
+        weights through copy-on-write.
+        """
+        self.acquire(language, model_id, torch.device(device))
+
+    @staticmethod
+    def _load(language: str, model_id: str, device: torch.device):
+        try:
+            path = model_artifact_path(model_id)
+            if path.exists():
+                logger.info(f"Loading Silero model: {path} ({language}, {device})")
+                importer = torch.package.PackageImporter(str(path))
+                model = importer.load_pickle("tts_models", "model")
+                example_text = None
+            elif ALLOW_HUB:
+                logger.warning(f"{path} not found, loading {model_id} from torch.hub")
+                model, example_text = torch.hub.load(
+                    repo_or_dir='snakers4/silero-models',
+                    model='silero_tts',
+                    language=language,
+                    speaker=model_id,
+                    trust_repo=True
+                )
+            else:
+                raise FileNotFoundError(f"Silero model artifact not found: {path}")
+            model.to(device)
+            # Silero models are already in eval mode, no need to call .eval()
+            logger.info(f"Silero model loaded successfully. Available speakers: {model.speakers}")
+            return model, example_text
+        except Exception as e:
+            logger.error(f"Failed to load Silero model: {e}", exc_info=True)
+            raise
+
+
+model_registry = _ModelRegistry()
+
 
 class LocalSileroTTS(tts.TTS):
     """Local Silero TTS using v5_ru model."""
@@ -23,10 +248,16 @@ class LocalSileroTTS(tts.TTS):
         put_yo: bool = True,
         put_stress_homo: bool = False,
         put_yo_homo: bool = True,
-        
+        use_cache: bool = True,
+        scheduler: Optional[InferenceScheduler] = None,
+        telephony: Optional[str] = None,
+        normalize_text: bool = True,
     ):
+        # Telephony mode synthesizes at (or near) the SIP codec rate instead of 48 kHz
+        if telephony is not None:
+            sample_rate = TELEPHONY_SAMPLE_RATES[telephony]
         super().__init__(
-            capabilities=tts.TTSCapabilities(streaming=False),
+            capabilities=tts.TTSCapabilities(streaming=True),
             sample_rate=sample_rate,
             num_channels=1,
         )
@@ -38,29 +269,91 @@ class LocalSileroTTS(tts.TTS):
         self.put_yo = put_yo
         self.put_stress_homo = put_stress_homo
         self.put_yo_homo = put_yo_homo
+        self.normalize_text = normalize_text
+        self.model_sample_rate = model_sample_rate(sample_rate)
+        g = math.gcd(sample_rate, self.model_sample_rate)
+        self._resample = (sample_rate // g, self.model_sample_rate // g)
         self._model = None
+        self._model_lock = threading.Lock()
         self._example_text = None
+        self._cache: Optional[AudioCache] = audio_cache if use_cache else None
+        self.scheduler = scheduler or default_scheduler()
     
     def _load_model(self):
-        """Lazy load the Silero TTS model."""
+        """Lazy acquire the shared Silero TTS model."""
         if self._model is None:
-            try:
-                logger.info(f"Loading Silero model: {self.model_id} (speaker: {self.speaker})")
-                self._model, self._example_text = torch.hub.load(
-                    repo_or_dir='snakers4/silero-models',
-                    model='silero_tts',
-                    language=self.language,
-                    speaker=self.model_id,
-                    trust_repo=True
-                )
-                self._model.to(self.device)
-                # Silero models are already in eval mode, no need to call .eval()
-                logger.info(f"Silero model loaded successfully. Available speakers: {self._model.speakers}")
-            except Exception as e:
-                logger.error(f"Failed to load Silero model: {e}", exc_info=True)
-                raise
+            with self._model_lock:
+                if self._model is None:
+                    shared = model_registry.acquire(self.language, self.model_id, self.device)
+                    self._example_text = shared.example_text
+                    self._model = shared.model
         return self._model
+
+    async def aclose(self) -> None:
+        with self._model_lock:
+            if self._model is not None:
+                self._model = None
+                model_registry.release(self.language, self.model_id, self.device)
+        await super().aclose()
     
+    def synthesis_params(self) -> dict:
+        """Per-session apply_tts arguments (everything except the text)."""
+        return dict(
+            speaker=self.speaker,
+            sample_rate=self.model_sample_rate,
+            put_accent=self.put_accent,
+            put_yo=self.put_yo,
+            put_stress_homo=self.put_stress_homo,
+            put_yo_homo=self.put_yo_homo,
+        )
+
+    def _generate_pcm(self, text: str) -> memoryview:
+        """Synthesize one phrase to 16-bit PCM (blocking, runs on the scheduler)."""
+        model = self._load_model()
+        audio = model.apply_tts(text=text, **self.synthesis_params())
+        return self._to_pcm(audio)
+
+    def _to_pcm(self, audio) -> memoryview:
+        """Resample model output to the output rate (if needed) and convert to PCM."""
+        up, down = self._resample
+        if up != down:
+            if isinstance(audio, torch.Tensor):
+                audio = audio.detach().cpu().numpy()
+            audio = resample_poly(audio, up, down)
+        return audio_to_pcm(audio)
+
+    def _cache_key(self, text: str) -> str:
+        return AudioCache.make_key(
+            text, model_id=self.model_id, output_rate=self.sample_rate, **self.synthesis_params()
+        )
+
+    def _generate_pcm_cached(self, text: str, key: str) -> memoryview:
+        pcm = self._cache.get(key)
+        if pcm is None:
+            pcm = self._generate_pcm(text)
+            self._cache.put(key, pcm)
+        return pcm
+
+    async def _synthesize_pcm(self, text: str, priority: int = PRIORITY_NEXT) -> memoryview:
+        # Digits, dates, times, prices and phones -> Russian words (memoized)
+        if self.normalize_text:
+            text = normalize_ru(text)
+
+        key = None
+        if self._cache is not None:
+            # Memory hits are served straight from the event loop; the disk
+            # tier and the model both run on the inference scheduler.
+            key = self._cache_key(text)
+            pcm = self._cache.get_memory(key)
+            if pcm is not None:
+                return pcm
+
+        if key is None:
+            return await self.scheduler.run(self._generate_pcm, text, priority=priority, cost=len(text))
+        return await self.scheduler.run(
+            self._generate_pcm_cached, text, key, priority=priority, cost=len(text)
+        )
+
     def synthesize(self, text: str, *, conn_options=None) -> "LocalSileroTTSStream":
         return LocalSileroTTSStream(
             tts=self,
@@ -68,6 +361,19 @@ class LocalSileroTTS(tts.TTS):
             conn_options=conn_options,
         )
 
+    def stream(
+        self, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS
+    ) -> "LocalSileroSynthesizeStream":
+        return LocalSileroSynthesizeStream(tts=self, conn_options=conn_options)
+
+
+def _push_pcm(output_emitter: tts.AudioEmitter, pcm, sample_rate: int) -> None:
+    # Emit whole 20 ms frames (16-bit mono) as zero-copy memoryview slices
+    view = memoryview(pcm).cast("B")
+    frame_bytes = sample_rate * FRAME_MS // 1000 * 2
+    for i in range(0, len(view), frame_bytes):
+        output_emitter.push(view[i:i + frame_bytes])
+
 
 class LocalSileroTTSStream(tts.ChunkedStream):
     """Stream for local Silero TTS synthesis."""
@@ -87,44 +393,90 @@ class LocalSileroTTSStream(tts.ChunkedStream):
             sample_rate=self._tts.sample_rate,
             num_channels=1,
             mime_type="audio/pcm",
+            frame_size_ms=FRAME_MS,
         )
-        
-        # Load model if not already loaded
-        model = self._tts._load_model()
-        
-        # Generate audio using the same parameters as tts_silero.py
-        def generate_audio():
-            audio = model.apply_tts(
-                text=self._input_text,
-                speaker=self._tts.speaker,
-                sample_rate=self._tts.sample_rate,
-                put_accent=self._tts.put_accent,
-                put_yo=self._tts.put_yo,
-                put_stress_homo=self._tts.put_stress_homo,
-                put_yo_homo=self._tts.put_yo_homo,
-                
-            )
-            return audio
-        
-        # Run synthesis in executor to avoid blocking
-        import asyncio
-        loop = asyncio.get_event_loop()
-        audio = await loop.run_in_executor(None, generate_audio)
-        
-        # Convert to numpy array if needed
-        if isinstance(audio, torch.Tensor):
-            audio = audio.detach().cpu().numpy()
-        elif not isinstance(audio, np.ndarray):
-            audio = np.array(audio)
-        
-        # Convert float32 [-1, 1] to int16 PCM
-        audio_int16 = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
-        audio_bytes = audio_int16.tobytes()
-        
-        # Emit audio in chunks (4096 bytes = ~42ms at 48kHz 16-bit mono)
-        chunk_size = 4096
-        for i in range(0, len(audio_bytes), chunk_size):
-            chunk = audio_bytes[i:i + chunk_size]
-            output_emitter.push(chunk)
-        
-        output_emitter.flush()
\ No newline at end of file
+
+        # Synthesize phrase by phrase so audio is pushed as it is produced
+        splitter = _PhraseSplitter()
+        phrases = splitter.push(self._input_text) + splitter.flush()
+
+        priority = PRIORITY_FIRST
+        for i, phrase in enumerate(phrases):
+            # Run synthesis on the inference scheduler to avoid blocking
+            try:
+                pcm = await self._tts._synthesize_pcm(phrase, priority)
+            except asyncio.CancelledError:
+                # Barge-in: the remaining phrases are never synthesized
+                for skipped in phrases[i + 1:]:
+                    self._tts.scheduler.record_cancelled(len(skipped))
+                raise
+            _push_pcm(output_emitter, pcm, self._tts.sample_rate)
+            priority = PRIORITY_NEXT
+
+        output_emitter.flush()
+
+
+class LocalSileroSynthesizeStream(tts.SynthesizeStream):
+    """Streaming synthesis: speaks LLM text phrase by phrase as it arrives."""
+
+    def __init__(self, *, tts: LocalSileroTTS, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, conn_options=conn_options)
+        self._tts: LocalSileroTTS = tts
+
+    async def _run(self, output_emitter: tts.AudioEmitter):
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=self._tts.sample_rate,
+            num_channels=1,
+            mime_type="audio/pcm",
+            frame_size_ms=FRAME_MS,
+            stream=True,
+        )
+        output_emitter.start_segment(segment_id=utils.shortuuid())
+
+        splitter = _PhraseSplitter()
+        phrases: asyncio.Queue[Optional[str]] = asyncio.Queue()
+
+        async def _read_input():
+            async for data in self._input_ch:
+                if isinstance(data, self._FlushSentinel):
+                    for phrase in splitter.flush():
+                        phrases.put_nowait(phrase)
+                    continue
+                for phrase in splitter.push(data):
+                    phrases.put_nowait(phrase)
+
+            for phrase in splitter.flush():
+                phrases.put_nowait(phrase)
+            phrases.put_nowait(None)
+
+        async def _synthesize():
+            # Phrases are synthesized one after another while input keeps
+            # arriving, so the first one is heard before the LLM has finished.
+            priority = PRIORITY_FIRST
+            try:
+                while True:
+                    phrase = await phrases.get()
+                    if phrase is None:
+                        break
+                    self._mark_started()
+                    pcm = await self._tts._synthesize_pcm(phrase, priority)
+                    priority = PRIORITY_NEXT
+                    _push_pcm(output_emitter, pcm, self._tts.sample_rate)
+            except asyncio.CancelledError:
+                # Barge-in: phrases still waiting here are never synthesized
+                while not phrases.empty():
+                    skipped = phrases.get_nowait()
+                    if skipped is not None:
+                        self._tts.scheduler.record_cancelled(len(skipped))
+                raise
+            output_emitter.end_segment()
+
+        tasks = [
+            asyncio.create_task(_read_input()),
+            asyncio.create_task(_synthesize()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            await utils.aio.cancel_and_wait(*tasks)